@@ -0,0 +1,182 @@
+# 批量任务：多省份 × 多关键词 × 多日期范围，在进程池中运行
+# batch_runner.py
+
+import argparse
+import itertools
+import json
+import multiprocessing.util
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from config import BATCH_PROCESSES, DEFAULT_WORKERS, BROWSER_BACKEND, BLOCK_RESOURCES, HTML_CACHE_MODE, RESULT_STORE_PATH
+from html_cache import CACHE_MODES
+from logger_config import get_logger
+from province_mapping import get_province_pinyin
+
+logger = get_logger("batch")
+
+
+def load_jobs(path):
+    """
+    Reads a job file and expands it into a list of job dicts with the keys
+    province, keyword, start_date and end_date.
+
+    The file is a JSON object. `provinces` (pinyin), `keywords` and
+    `date_ranges` (a list of [start, end] pairs) are combined as a cartesian
+    product; an optional `jobs` list adds individual jobs as-is. Any other keys
+    (e.g. `output`, `workers`, `processes`) are returned as run options.
+    """
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+
+    jobs = [
+        {"province": province, "keyword": keyword, "start_date": start_date, "end_date": end_date}
+        for province, keyword, (start_date, end_date) in itertools.product(
+            spec.pop("provinces", []), spec.pop("keywords", []), spec.pop("date_ranges", [])
+        )
+    ]
+    jobs.extend(spec.pop("jobs", []))
+    for job in jobs:
+        missing = [key for key in ("province", "keyword", "start_date", "end_date") if not job.get(key)]
+        if missing:
+            raise ValueError(f"任务缺少字段 {missing}: {job}")
+        if not get_province_pinyin(job["province"]):
+            raise ValueError(f"无效的省份拼音: '{job['province']}'")
+    return jobs, spec
+
+
+def _init_worker():
+    # 每个工作进程的浏览器与 HTTP 连接在任务之间保持打开，进程退出时再统一关闭
+    from fetcher import close_browsers, get_http_session
+    get_http_session()
+    multiprocessing.util.Finalize(None, close_browsers, exitpriority=10)
+
+
+def _run_job(job, output_dir, options):
+    """Runs one job inside a worker process and returns its result summary."""
+    from main import start_crawl_process
+    from fetcher import fetch_stats
+
+    started = time.time()
+    result = dict(job, filename=None, status="failed", pages=0, elapsed=0.0)
+    try:
+        filename = start_crawl_process(
+            job["province"],
+            get_province_pinyin(job["province"]),
+            job["keyword"],
+            job["start_date"],
+            job["end_date"],
+            output_dir,
+            keep_browsers=True,
+            **options
+        )
+        result["pages"] = sum(counts["cache"] + counts["http"] + counts["browser"]
+                              for province, counts in fetch_stats.snapshot().items() if province != "search")
+        if filename and os.path.exists(filename):
+            result.update(filename=filename, status="ok")
+        elif filename:
+            result["status"] = "empty"
+    except Exception:
+        logger.error(f"任务 {job} 运行失败:\n{traceback.format_exc()}")
+    result["elapsed"] = time.time() - started
+    return result
+
+
+def run_batch(jobs, output_dir="output", processes=BATCH_PROCESSES, **options):
+    """
+    Runs `jobs` on a pool of `processes` worker processes and returns their
+    results in job order. Every worker keeps its browsers and HTTP connections
+    warm across the jobs it runs. `options` are passed to start_crawl_process
+    (workers, backend, block_resources, cache_mode, ...).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=max(1, processes), initializer=_init_worker) as executor:
+        futures = {executor.submit(_run_job, job, output_dir, options): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                # 工作进程异常退出（例如被系统杀掉）
+                results[i] = dict(jobs[i], filename=None, status="failed", pages=0, elapsed=0.0)
+                logger.error(f"任务 {jobs[i]} 的工作进程异常退出: {e}")
+            logger.info(f"📦 已完成 {sum(r is not None for r in results)}/{len(jobs)} 个任务。")
+
+    for result in results:
+        result["records"] = len(pd.read_csv(result["filename"], encoding="utf-8-sig")) if result["filename"] else 0
+    return results
+
+
+def merge_outputs(results, output_dir):
+    """Concatenates the per-job CSVs into one merged CSV. Returns its path, or None if there was nothing to merge."""
+    frames = [pd.read_csv(r["filename"], encoding="utf-8-sig") for r in results if r["filename"]]
+    if not frames:
+        return None
+    merged = os.path.join(output_dir, f"merged_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+    pd.concat(frames, ignore_index=True).to_csv(merged, index=False, encoding="utf-8-sig", na_rep="N/A")
+    return merged
+
+
+def log_summary(results):
+    """Logs one row per job with its record count and throughput."""
+    header = f"{'省份':<10}{'关键词':<10}{'日期范围':<24}{'状态':<8}{'记录数':>8}{'详情页':>8}{'耗时(秒)':>10}{'页/分钟':>10}{'记录/分钟':>10}"
+    logger.info("\n📋 批量任务汇总")
+    logger.info(header)
+    for r in results:
+        minutes = r["elapsed"] / 60 or 1
+        logger.info(
+            f"{r['province']:<10}{r['keyword']:<10}{r['start_date'] + '~' + r['end_date']:<24}{r['status']:<8}"
+            f"{r['records']:>8}{r['pages']:>8}{r['elapsed']:>10.1f}{r['pages'] / minutes:>10.1f}{r['records'] / minutes:>10.1f}"
+        )
+    total_elapsed = sum(r["elapsed"] for r in results)
+    logger.info(f"共 {len(results)} 个任务，成功 {sum(r['status'] == 'ok' for r in results)} 个，"
+                f"记录 {sum(r['records'] for r in results)} 条，累计耗时 {total_elapsed:.1f} 秒。")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py batch", description="批量运行多省份、多关键词的抓取任务")
+    parser.add_argument("job_file", help="任务文件 (JSON)")
+    parser.add_argument("--output", help="输出目录 (默认读取任务文件中的 output，否则为 output)")
+    parser.add_argument("--processes", type=int, help=f"同时运行的任务进程数 (默认 {BATCH_PROCESSES})")
+    parser.add_argument("--workers", type=int, help=f"每个任务的详情页并发抓取线程数 (默认 {DEFAULT_WORKERS})")
+    parser.add_argument("--backend", choices=("selenium", "playwright"), help=f"浏览器后端 (默认 {BROWSER_BACKEND})")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, help=f"本地 HTML 缓存模式 (默认 {HTML_CACHE_MODE})")
+    parser.add_argument("--incremental", action="store_true", help="增量模式：跳过已抓取过的公告，只输出新记录")
+    parser.add_argument("--store", nargs="?", const=RESULT_STORE_PATH, metavar="DB", help=f"所有任务同时写入同一个 SQLite 结果库 (默认 {RESULT_STORE_PATH})")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs, spec = load_jobs(args.job_file)
+    except (OSError, ValueError) as e:
+        parser.error(f"无法读取任务文件: {e}")
+    if not jobs:
+        parser.error("任务文件中没有任何任务。")
+
+    output_dir = args.output or spec.get("output", "output")
+    processes = args.processes or spec.get("processes", BATCH_PROCESSES)
+    options = {
+        "workers": args.workers or spec.get("workers", DEFAULT_WORKERS),
+        "backend": args.backend or spec.get("backend", BROWSER_BACKEND),
+        "browser_pool_size": spec.get("browser_pool_size"),
+        "block_resources": spec.get("block_resources", BLOCK_RESOURCES),
+        "cache_mode": args.cache_mode or spec.get("cache_mode", HTML_CACHE_MODE),
+        "incremental": args.incremental or spec.get("incremental", False),
+        "store_path": args.store or spec.get("store"),
+    }
+
+    logger.info(f"🚀 共 {len(jobs)} 个任务，使用 {processes} 个进程运行，输出目录: {output_dir}")
+    results = run_batch(jobs, output_dir, processes, **options)
+    merged = merge_outputs(results, output_dir)
+    log_summary(results)
+    if merged:
+        logger.info(f"🎉 合并结果已保存到 {merged}")
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,175 @@
+# 断点续爬：定期保存抓取进度，崩溃或中断后可从检查点继续
+# checkpoint.py
+
+import json
+import os
+import threading
+import time
+import uuid
+
+from config import CHECKPOINT_DIR, CHECKPOINT_INTERVAL
+
+
+class Checkpoint:
+    """
+    Periodically persisted state of one crawl run, identified by `run_id`.
+
+    Two files are kept in `directory`:
+
+    - `<run_id>.json`: the run parameters, the leaf date windows whose list
+      pages are complete, whether the whole list phase is complete, and a
+      snapshot of the frontier. Rewritten atomically at most every `interval`
+      seconds (and on demand).
+    - `<run_id>.results.jsonl`: one line per detail link written by the
+      pipeline, in link order, with its records. Appended and flushed as the
+      writer goes, so finished work survives a crash between snapshots.
+
+    On resume, `restore()` refills the frontier and returns the written lines;
+    the crawl then continues after the last written link.
+    """
+    def __init__(self, run_id, params, directory=CHECKPOINT_DIR, interval=CHECKPOINT_INTERVAL):
+        self.run_id = run_id
+        self.params = params
+        self.directory = directory
+        self.interval = interval
+        self.list_done = False
+        self.completed_windows = set()
+        self._saved_links = []
+        self._frontier = None
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self._results = None
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def create(cls, params, directory=CHECKPOINT_DIR, **kwargs):
+        """Starts a new run with a fresh run id made of the time, the province and a random suffix."""
+        # 同一秒内同一进程可能开始多个运行（批量任务），时间和省份之外加上随机后缀保证编号唯一
+        run_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{params.get('province_pinyin', 'run')}_{uuid.uuid4().hex[:8]}"
+        checkpoint = cls(run_id, params, directory, **kwargs)
+        checkpoint.save()
+        return checkpoint
+
+    @classmethod
+    def load(cls, run_id, directory=CHECKPOINT_DIR, **kwargs):
+        """Loads the last saved state of `run_id`. Raises FileNotFoundError if there is none."""
+        with open(os.path.join(directory, f"{run_id}.json"), encoding="utf-8") as f:
+            state = json.load(f)
+        checkpoint = cls(run_id, state["params"], directory, **kwargs)
+        checkpoint.list_done = state.get("list_done", False)
+        checkpoint.completed_windows = {tuple(window) for window in state.get("completed_windows", [])}
+        checkpoint._saved_links = state.get("frontier", [])
+        return checkpoint
+
+    @property
+    def state_path(self):
+        return os.path.join(self.directory, f"{self.run_id}.json")
+
+    @property
+    def results_path(self):
+        return os.path.join(self.directory, f"{self.run_id}.results.jsonl")
+
+    def restore(self, frontier):
+        """
+        Refills `frontier` with the links known at the last checkpoint and
+        returns the lines already written (dicts with index, link, records and
+        any extra fields), in order. A torn last line from a crash is dropped.
+        """
+        lines = []
+        if os.path.exists(self.results_path):
+            with open(self.results_path, encoding="utf-8") as f:
+                for raw in f:
+                    try:
+                        line = json.loads(raw)
+                    except ValueError:
+                        break
+                    if line.get("index") != len(lines) + 1:
+                        break
+                    lines.append(line)
+            # 去掉可能残留的半行，后续从此处继续追加
+            with open(self.results_path, "w", encoding="utf-8") as f:
+                for line in lines:
+                    f.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+        # 已写出的链接先按原顺序加入，保证恢复后的序号与之前一致
+        frontier.extend(line["link"] for line in lines)
+        frontier.extend(self._saved_links)
+        self._frontier = frontier
+        return lines
+
+    def attach(self, frontier):
+        """Sets the frontier whose links are included in each snapshot."""
+        self._frontier = frontier
+
+    def mark_window_done(self, window):
+        with self._lock:
+            self.completed_windows.add(tuple(window))
+        self.maybe_save()
+
+    def mark_list_done(self):
+        with self._lock:
+            self.list_done = True
+        self.save()
+
+    def record_written(self, index, link, records, **extra):
+        """Appends one written link and its records to the results log."""
+        line = dict(extra, index=index, link=link, records=records)
+        with self._lock:
+            if self._results is None:
+                self._results = open(self.results_path, "a", encoding="utf-8")
+            self._results.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+            self._results.flush()
+        self.maybe_save()
+
+    def maybe_save(self):
+        if time.time() - self._last_save >= self.interval:
+            self.save()
+
+    def save(self):
+        """Atomically writes the current state snapshot."""
+        with self._lock:
+            state = {
+                "run_id": self.run_id,
+                "params": self.params,
+                "saved_at": time.time(),
+                "list_done": self.list_done,
+                "completed_windows": sorted(self.completed_windows),
+                "frontier": self._frontier.links() if self._frontier is not None else self._saved_links,
+            }
+            if self._results is not None:
+                os.fsync(self._results.fileno())
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.state_path)
+            self._last_save = time.time()
+
+    def close(self):
+        with self._lock:
+            if self._results is not None:
+                self._results.close()
+                self._results = None
+
+    def finish(self):
+        """Deletes the checkpoint files once the run's output has been saved."""
+        self.close()
+        for path in (self.state_path, self.results_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def list_checkpoints(directory=CHECKPOINT_DIR):
+    """Returns the saved states of unfinished runs, most recently saved first."""
+    if not os.path.isdir(directory):
+        return []
+    states = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                states.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(states, key=lambda state: state.get("saved_at", 0), reverse=True)
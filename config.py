@@ -18,3 +18,115 @@ SEARCH_URL_TEMPLATE = (
     "&dbselect=bidx&kw={keyword}&start_time={start}&end_time={end}&timeType=6"
     "&displayZone={province_name}&zoneId={zone_id}&pppStatus=0&agentName="
 )
+
+# 浏览器实例池：最大并存的 Chrome 数量，以及单个实例处理多少页面后回收重建
+DRIVER_POOL_SIZE = 2
+DRIVER_MAX_PAGES = 50
+
+# HTTP 直连快速通道：静态公告页优先用 keep-alive 连接池直接请求，缺少就绪元素时再回退到浏览器
+HTTP_FAST_PATH = True
+HTTP_POOL_SIZE = 16
+HTTP_TIMEOUT = 15
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9",
+}
+
+# 详情页并发抓取的默认线程数
+DEFAULT_WORKERS = 4
+
+# 浏览器后端："selenium"（ChromeDriver 实例池）或 "playwright"（单个常驻浏览器 + 页面池）
+BROWSER_BACKEND = "selenium"
+PLAYWRIGHT_PAGE_POOL_SIZE = 8
+PLAYWRIGHT_MAX_PAGE_USES = 100
+
+# 按域名限速：(每秒请求数, 突发上限)。列表页、详情页与江苏省站分别计算
+HOST_RATE_LIMITS = {
+    "search.ccgp.gov.cn": (0.5, 1),
+    "www.ccgp.gov.cn": (4.0, 4),
+    "www.ccgp-jiangsu.gov.cn": (2.0, 2),
+}
+DEFAULT_HOST_RATE_LIMIT = (1.0, 1)
+
+# 每个域名的自适应并发 (AIMD)：延迟正常时逐步提高并发，超时/403/429/5xx 时减半
+ADAPTIVE_CONCURRENCY = {
+    "initial": 2,
+    "minimum": 1,
+    "maximum": 16,
+    "target_latency": 5.0,
+}
+
+# 无头浏览器资源拦截：解析器只需要 DOM，默认不下载图片、字体、样式表和统计脚本
+BLOCK_RESOURCES = True
+BLOCKED_URL_PATTERNS = [
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.bmp*", "*.webp*", "*.svg*", "*.ico*",
+    "*.css*", "*.woff*", "*.ttf*", "*.otf*", "*.eot*", "*.mp4*",
+    "*hm.baidu.com*", "*cnzz.com*", "*google-analytics.com*", "*googletagmanager.com*",
+]
+BLOCKED_RESOURCE_TYPES = {"image", "font", "stylesheet", "media"}
+# 关闭资源拦截后页面才能正常渲染的省份（拼音）
+RESOURCE_BLOCKING_ALLOWLIST = set()
+
+# 本地 HTML 缓存：模式为 off / read / write / readwrite
+HTML_CACHE_MODE = "readwrite"
+HTML_CACHE_DIR = ".html_cache"
+HTML_CACHE_TTL = 30 * 24 * 3600         # 详情页缓存有效期（秒），已发布的中标公告几乎不会变化
+LIST_CACHE_TTL = 6 * 3600               # 列表页缓存有效期（秒），当天的搜索结果仍可能增加
+HTML_CACHE_MAX_BYTES = 2 * 1024 ** 3    # 压缩后正文的总大小上限，超出后按最近最少使用淘汰
+
+# 详情页流水线：解析线程数与各阶段之间有界队列的容量
+PARSE_WORKERS = 2
+PIPELINE_QUEUE_SIZE = 64
+# 同时在流水线中（抓取、解析或等待按序写出）的链接数上限：某个链接迟迟未完成时，后面的结果最多积压这么多
+PIPELINE_MAX_AHEAD = 256
+
+# 多进程解析：进程数为 0 时在解析线程内直接解析；单个页面的解析超时（秒）
+PARSE_PROCESSES = 0
+PARSE_TIMEOUT = 30
+
+# 列表页：每页结果条数，以及按 page_index 并发抓取列表页的线程数（实际速率仍受按域名限速约束）
+RESULTS_PER_PAGE = 20
+LIST_WORKERS = 4
+# 列表页加载失败时的重试次数与重试间隔（秒，逐次递增）；重试后仍失败的窗口不会记为已完成，续爬时会重新抓取
+LIST_PAGE_RETRIES = 2
+LIST_RETRY_DELAY = 3
+
+# 查询规划：单个日期窗口的命中数超过该阈值时，将窗口二分（最小到单日）后并行抓取，避免搜索站点截断结果
+SEARCH_RESULT_THRESHOLD = 1000
+PLANNER_WORKERS = 4
+
+# 批量任务：同时运行的任务进程数（每个进程内的抓取并发仍由 DEFAULT_WORKERS 控制）
+BATCH_PROCESSES = 2
+
+# 增量抓取：已抓取公告的持久索引，--incremental 模式下跳过索引中已有的详情页
+SEEN_INDEX_PATH = ".seen_index.sqlite"
+
+# 断点续爬：检查点目录与保存间隔（秒）
+CHECKPOINT_DIR = ".checkpoints"
+CHECKPOINT_INTERVAL = 30
+
+# 输出格式：csv（默认，utf-8-sig，可直接用 Excel 打开）或 jsonl（每行一条记录，便于交给其他工具处理）
+OUTPUT_FORMAT = "csv"
+
+# Excel 转换：并行转换的进程数（1 表示在当前进程中逐个转换），以及每次读取的 CSV 行数
+CONVERTER_PROCESSES = 4
+CONVERTER_CHUNK_ROWS = 50000
+
+# Parquet 数据集：按 省份/发布月份 分区写出的结果（--parquet 开启），以及每个分区文件缓冲的行数
+PARQUET_DATASET_DIR = "dataset"
+PARQUET_BATCH_ROWS = 5000
+
+# 结果库：--store 开启时把记录写入的 SQLite 数据库（python main.py query 查询），以及每个事务最多合并的详情页数
+RESULT_STORE_PATH = "results.sqlite"
+RESULT_STORE_BATCH_PAGES = 200
+
+# 全文索引：每个详情页正文 (div.vF_detail_content) 的本地索引，python main.py search-local 用它检索关键词
+TEXT_INDEX_PATH = ".text_index.sqlite"
+
+# 页面存档：永久保存抓取到的详情页（不过期、不淘汰），python main.py reparse 用当前解析器离线重新解析；0 表示使用全部 CPU 核心
+PAGE_ARCHIVE_DIR = ".page_archive"
+REPARSE_PROCESSES = 0
@@ -2,8 +2,93 @@ import pandas as pd
 import os
 import glob
 import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def run_converter(target_directory, logger=None):
+from openpyxl import Workbook
+
+from config import CONVERTER_PROCESSES, CONVERTER_CHUNK_ROWS
+
+# Excel 单个工作表最多 1,048,576 行，其中一行用于表头
+EXCEL_MAX_DATA_ROWS = 1048575
+
+
+def _column_dtypes(file_path, chunk_rows):
+    """
+    Works out the type of every column over the whole CSV, in chunks, the
+    way a single pd.read_csv of the file would: a column is numeric only if
+    it is numeric in every chunk (float if any chunk needs floats), otherwise
+    it is read as text. Returns a dtype mapping for pd.read_csv.
+    """
+    kinds = {}
+    for chunk in pd.read_csv(file_path, encoding='utf-8-sig', chunksize=chunk_rows):
+        for column, dtype in chunk.dtypes.items():
+            if pd.api.types.is_bool_dtype(dtype):
+                kind = 'bool'
+            elif pd.api.types.is_integer_dtype(dtype):
+                kind = 'int'
+            elif pd.api.types.is_float_dtype(dtype):
+                kind = 'float'
+            else:
+                kind = 'str'
+            kinds.setdefault(column, set()).add(kind)
+    dtypes = {}
+    for column, found in kinds.items():
+        if found <= {'int', 'float'}:
+            if 'float' in found:
+                dtypes[column] = 'float64'
+        elif found != {'bool'}:
+            dtypes[column] = str
+    return dtypes
+
+
+def convert_csv_to_xlsx(file_path, chunk_rows=CONVERTER_CHUNK_ROWS, max_rows_per_sheet=EXCEL_MAX_DATA_ROWS):
+    """
+    Converts one CSV file to XLSX next to it with constant memory use.
+
+    The CSV is read in chunks of `chunk_rows` rows and streamed into an
+    openpyxl write-only workbook, so neither file is held in memory as a
+    whole. When the data exceeds `max_rows_per_sheet` rows it continues on
+    new sheets (Sheet1, Sheet2, ...), each with its own header row. Column
+    types are worked out over the whole file in a first pass, so the values
+    written do not depend on where the chunks split (a 项目号 column holding
+    both '001' and 'A03' stays text throughout).
+
+    Returns (xlsx_path, row_count, sheet_count).
+    """
+    xlsx_path = os.path.splitext(file_path)[0] + '.xlsx'
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_rows = 0
+    sheet_count = 0
+    row_count = 0
+    header = [str(col) for col in pd.read_csv(file_path, encoding='utf-8-sig', nrows=0).columns]
+
+    def new_sheet():
+        nonlocal sheet, sheet_rows, sheet_count
+        sheet_count += 1
+        sheet = workbook.create_sheet(title=f"Sheet{sheet_count}")
+        sheet.append(header)
+        sheet_rows = 0
+
+    dtypes = _column_dtypes(file_path, chunk_rows)
+    new_sheet()
+    for chunk in pd.read_csv(file_path, encoding='utf-8-sig', chunksize=chunk_rows, dtype=dtypes):  # Use utf-8-sig to handle BOM
+        # NaN 写为空单元格，与 DataFrame.to_excel 一致
+        values = chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+        for row in values:
+            if sheet_rows >= max_rows_per_sheet:
+                new_sheet()
+            sheet.append(row)
+            sheet_rows += 1
+        row_count += len(chunk)
+
+    tmp_path = xlsx_path + '.tmp'
+    workbook.save(tmp_path)
+    os.replace(tmp_path, xlsx_path)
+    return xlsx_path, row_count, sheet_count
+
+
+def run_converter(target_directory, logger=None, processes=CONVERTER_PROCESSES):
     """
     Converts all CSV files in the specified directory to XLSX format, with logging.
 
@@ -11,6 +96,9 @@ def run_converter(target_directory, logger=None):
         target_directory (str): The path to the directory containing CSV files.
         logger (object, optional): A logger object with a `put` method for logging.
                                    If None, prints to console. Defaults to None.
+        processes (int, optional): Number of files converted in parallel, each in its
+                                   own process. 1 converts the files one by one in the
+                                   current process. Defaults to CONVERTER_PROCESSES.
     
     Returns:
         bool: True if any files were successfully converted, False otherwise.
@@ -27,24 +115,38 @@ def run_converter(target_directory, logger=None):
         log_message("ℹ️ 在目标目录中未找到可转换的 .csv 文件。")
         return False
 
+    def on_converted(file_path, result):
+        xlsx_path, row_count, sheet_count = result
+        # Remove the original CSV file after successful conversion
+        os.remove(file_path)
+        sheets = f"，分为 {sheet_count} 个工作表" if sheet_count > 1 else ""
+        log_message(f"  ✔ 转换成功: {os.path.basename(xlsx_path)}（{row_count} 行{sheets}）")
+
+    def on_failed(file_path, e):
+        error_msg = f"  ❌ 转换失败: {os.path.basename(file_path)}\n     原因: {e}\n     详细信息: {traceback.format_exc()}"
+        log_message(error_msg)
+
     success_count = 0
-    for file_path in csv_files:
-        filename = os.path.basename(file_path)
-        try:
-            log_message(f"  - 正在转换: {filename}...")
-            df = pd.read_csv(file_path, encoding='utf-8-sig') # Use utf-8-sig to handle BOM
-            xlsx_path = os.path.splitext(file_path)[0] + '.xlsx'
-            
-            df.to_excel(xlsx_path, index=False, engine='openpyxl')
-            
-            # Remove the original CSV file after successful conversion
-            os.remove(file_path)
-            log_message(f"  ✔ 转换成功: {os.path.basename(xlsx_path)}")
-            success_count += 1
-            
-        except Exception as e:
-            error_msg = f"  ❌ 转换失败: {filename}\n     原因: {e}\n     详细信息: {traceback.format_exc()}"
-            log_message(error_msg)
+    processes = max(1, min(processes, len(csv_files)))
+    if processes == 1:
+        for file_path in csv_files:
+            log_message(f"  - 正在转换: {os.path.basename(file_path)}...")
+            try:
+                on_converted(file_path, convert_csv_to_xlsx(file_path))
+                success_count += 1
+            except Exception as e:
+                on_failed(file_path, e)
+    else:
+        log_message(f"  - 使用 {processes} 个进程并行转换 {len(csv_files)} 个文件...")
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = {executor.submit(convert_csv_to_xlsx, file_path): file_path for file_path in csv_files}
+            for future in as_completed(futures):
+                file_path = futures[future]
+                try:
+                    on_converted(file_path, future.result())
+                    success_count += 1
+                except Exception as e:
+                    on_failed(file_path, e)
     
     if success_count > 0:
         log_message(f"✅ 转换完成！共 {success_count} 个文件已成功转换为 XLSX 并移除原文件。")
@@ -7,7 +7,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
-from driver_setup import get_webdriver
+from fetcher import fetch_html
 
 # 规范：开发者无需修改 BaseParser
 class BaseParser:
@@ -166,19 +166,4 @@ def get_dynamic_html(url, parser_type='local'):
     获取动态HTML，函数签名和基础逻辑保持不变。
     parser_type 在此模块中未使用，但为兼容主程序而保留。
     """
-    driver = None
-    try:
-        driver = get_webdriver()
-        driver.get(url)
-        # 等待页面主要内容区域加载完成
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.vF_detail_content"))
-        )
-        html = driver.page_source
-    except (TimeoutException, WebDriverException, FileNotFoundError) as e:
-        print(f"处理页面时出错: {url}, 错误: {e}")
-        html = None # 出错返回 None
-    finally:
-        if driver:
-            driver.quit()
-    return html
+    return fetch_html(url, "div.vF_detail_content", province="chongqing")
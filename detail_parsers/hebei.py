@@ -10,7 +10,7 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
-from driver_setup import get_webdriver
+from fetcher import fetch_html
 
 class BaseParser:
     def parse(self, html: str):
@@ -170,20 +170,7 @@ def get_parser_for_url(url: str):
     return None
 
 def get_dynamic_html(url):
-    driver = None
-    try:
-        driver = get_webdriver()
-        driver.get(url)
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.vF_detail_content"))
-        )
-        return driver.page_source
-    except (TimeoutException, WebDriverException, FileNotFoundError) as e:
-        print(f"处理页面时出错: {url}, 错误: {e}")
-        return None
-    finally:
-        if driver:
-            driver.quit()
+    return fetch_html(url, "div.vF_detail_content", province="hebei")
 
 # # --- 独立测试代码 ---
 # if __name__ == '__main__':
@@ -0,0 +1,161 @@
+# 浏览器实例池
+# driver_pool.py
+
+import threading
+from contextlib import contextmanager
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from config import DRIVER_POOL_SIZE, DRIVER_MAX_PAGES
+from driver_setup import get_webdriver
+
+
+class DriverPool:
+    """
+    A bounded, thread-safe pool of Selenium WebDriver instances.
+
+    Drivers are created lazily up to `size`, handed out with `checkout()` and
+    returned with `checkin()`. A driver is health-checked before it is handed
+    out and is recycled (quit and replaced) after serving `max_pages` pages,
+    which keeps long runs from accumulating Chrome memory leaks.
+    """
+    def __init__(self, size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES, factory=get_webdriver):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+        self.max_pages = max_pages
+        self._factory = factory
+        self._idle = []
+        self._uses = {}
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def checkout(self, timeout=None):
+        """
+        Takes a healthy driver out of the pool, creating one if the pool is not
+        yet full. Blocks until a driver is available or `timeout` expires.
+
+        Raises:
+            TimeoutError: If no driver became available in time.
+            WebDriverException / FileNotFoundError: If a new driver cannot be started.
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("DriverPool is closed")
+                if self._idle:
+                    driver = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    driver = None
+                    break
+                if not self._cond.wait(timeout):
+                    raise TimeoutError("No WebDriver became available in time")
+
+        if driver is not None and self._is_healthy(driver):
+            return driver
+        if driver is not None:
+            self._discard(driver, release_slot=False)
+        try:
+            driver = self._factory()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._uses[id(driver)] = 0
+        return driver
+
+    def checkin(self, driver, broken=False):
+        """
+        Returns a driver to the pool. Drivers reported as `broken`, or which have
+        reached `max_pages`, are quit and their slot is freed for a fresh one.
+        """
+        with self._cond:
+            uses = self._uses.get(id(driver), 0) + 1
+            self._uses[id(driver)] = uses
+            recycle = broken or self._closed or (self.max_pages and uses >= self.max_pages)
+            if not recycle:
+                self._idle.append(driver)
+                self._cond.notify()
+                return
+        self._discard(driver)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """
+        Context manager wrapper around checkout/checkin. A WebDriverException
+        raised inside the block (other than a page-load TimeoutException) marks
+        the driver as broken.
+        """
+        driver = self.checkout(timeout)
+        broken = False
+        try:
+            yield driver
+        except TimeoutException:
+            raise
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.checkin(driver, broken=broken)
+
+    def close(self):
+        """Quits all idle drivers. Drivers still checked out are quit on checkin."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for driver in idle:
+            self._discard(driver)
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver, release_slot=True):
+        with self._cond:
+            self._uses.pop(id(driver), None)
+            if release_slot:
+                self._created -= 1
+                self._cond.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool(size=None):
+    """
+    Returns the process-wide driver pool shared by the list crawler and all
+    province modules, creating it on first use. Passing `size` grows the pool
+    if it is smaller than requested.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = DriverPool(size=size or DRIVER_POOL_SIZE)
+        elif size and size > _shared_pool.size:
+            with _shared_pool._cond:
+                _shared_pool.size = size
+                _shared_pool._cond.notify_all()
+        return _shared_pool
+
+
+def close_shared_pool():
+    """Quits every driver of the shared pool. A later call to get_shared_pool starts a new one."""
+    global _shared_pool
+    with _shared_pool_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool:
+        pool.close()
@@ -5,6 +5,8 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import WebDriverException
 
+from config import BLOCKED_URL_PATTERNS
+
 def get_webdriver():
     """
     Initializes and returns a Selenium WebDriver instance using the local chromedriver.
@@ -40,4 +42,17 @@ def get_webdriver():
         return driver
     except WebDriverException as e:
         # Re-raise the exception to be handled by the caller
-        raise WebDriverException(f"Failed to create WebDriver: {e.msg}") 
\ No newline at end of file
+        raise WebDriverException(f"Failed to create WebDriver: {e.msg}")
+
+
+def set_resource_blocking(driver, enabled):
+    """
+    Turns CDP-level blocking of images, fonts, stylesheets and analytics
+    scripts (config.BLOCKED_URL_PATTERNS) on or off for the given driver.
+    The current state is remembered on the driver so repeated calls are free.
+    """
+    if getattr(driver, "_resource_blocking", None) == enabled:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS if enabled else []})
+    driver._resource_blocking = enabled
@@ -0,0 +1,239 @@
+# 页面抓取器：HTTP 直连快速通道 + 浏览器回退
+# fetcher.py
+
+import sys
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from config import (
+    HTTP_FAST_PATH, HTTP_POOL_SIZE, HTTP_TIMEOUT, HTTP_HEADERS, BROWSER_BACKEND,
+    BLOCK_RESOURCES, RESOURCE_BLOCKING_ALLOWLIST, HTML_CACHE_MODE,
+)
+from driver_pool import get_shared_pool, close_shared_pool
+from driver_setup import set_resource_blocking
+from html_cache import HtmlCache
+from logger_config import get_logger
+from rate_limiter import throttle
+
+logger = get_logger("fetcher")
+
+BROWSER_BACKENDS = ("selenium", "playwright")
+
+_session = None
+_session_lock = threading.Lock()
+_browser_backend = BROWSER_BACKEND
+_browser_pool_size = None
+_block_resources = BLOCK_RESOURCES
+_cache = None
+
+
+def set_browser_backend(name, pool_size=None):
+    """
+    Selects which browser renders pages that the HTTP fast path cannot serve,
+    and how many pages/drivers it may keep open concurrently.
+    """
+    global _browser_backend, _browser_pool_size
+    if name not in BROWSER_BACKENDS:
+        raise ValueError(f"未知的浏览器后端: {name}")
+    _browser_backend = name
+    _browser_pool_size = pool_size
+
+
+def get_browser_backend():
+    return _browser_backend
+
+
+def set_block_resources(enabled):
+    """Globally enables or disables resource blocking in the headless browser."""
+    global _block_resources
+    _block_resources = enabled
+
+
+def configure_cache(mode=HTML_CACHE_MODE, **kwargs):
+    """
+    Replaces the process-wide HTML cache used by fetch_html. `mode` is one of
+    html_cache.CACHE_MODES; extra keyword arguments go to HtmlCache.
+    """
+    global _cache
+    old, _cache = _cache, HtmlCache(mode=mode, **kwargs)
+    if old is not None:
+        old.close()
+    return _cache
+
+
+def get_cache():
+    if _cache is None:
+        configure_cache()
+    return _cache
+
+
+def _should_block_resources(province):
+    return _block_resources and province not in RESOURCE_BLOCKING_ALLOWLIST
+
+
+def get_http_session():
+    """Returns the shared keep-alive HTTP session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(HTTP_HEADERS)
+            _session = session
+        return _session
+
+
+class FetchStats:
+    """Thread-safe per-province counters of how each page was obtained."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, province, outcome):
+        with self._lock:
+            counts = self._counts.setdefault(province or "unknown", {"cache": 0, "http": 0, "browser": 0, "failed": 0})
+            counts[outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {province: dict(counts) for province, counts in self._counts.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+fetch_stats = FetchStats()
+
+
+def fetch_html(url, ready_selector, province=None, timeout=20, ready_text=None, cache_ttl=None):
+    """
+    Fetches a page and returns its HTML, or None if it could not be loaded.
+
+    The on-disk HTML cache is consulted first (entries older than `cache_ttl`
+    seconds, or the cache's own TTL, are ignored). On a miss a plain keep-alive
+    HTTP GET is tried; its body is accepted only if
+    `ready_selector` (the same CSS selector the browser would wait for) is
+    present in the server-rendered HTML. Otherwise the page is rendered by the
+    selected browser backend. If `ready_text` is given, a page containing that
+    text also counts as ready (e.g. an empty search result page). Successfully
+    fetched pages are written back to the cache.
+    """
+    cache = get_cache()
+    html = cache.get(url, ttl=cache_ttl)
+    if html is not None:
+        fetch_stats.record(province, "cache")
+        return html
+
+    if HTTP_FAST_PATH:
+        html = _fetch_http(url, ready_selector, ready_text)
+        if html is not None:
+            fetch_stats.record(province, "http")
+            cache.put(url, html)
+            return html
+
+    block_resources = _should_block_resources(province)
+    with throttle.request(url) as ticket:
+        pool = _get_playwright_pool() if _browser_backend == "playwright" else None
+        if pool is not None:
+            html = pool.fetch(url, ready_selector, timeout, ready_text, block_resources=block_resources)
+        else:
+            html = _fetch_selenium(url, ready_selector, timeout, ready_text, block_resources)
+        ticket.failed = html is None
+    fetch_stats.record(province, "browser" if html is not None else "failed")
+    if html is not None:
+        cache.put(url, html)
+    return html
+
+
+def _get_playwright_pool():
+    """
+    Returns the shared Playwright page pool. If Playwright cannot be started
+    (not installed, browsers missing, ...), logs it once and switches this
+    process to the Selenium backend, returning None.
+    """
+    global _browser_backend
+    try:
+        from playwright_fetcher import get_playwright_pool
+        return get_playwright_pool(size=_browser_pool_size)
+    except Exception as e:
+        with _session_lock:
+            if _browser_backend == "playwright":
+                _browser_backend = "selenium"
+                logger.error(f"❌ 无法启动 Playwright 浏览器，改用 Selenium 渲染页面: {e}")
+        return None
+
+
+def _fetch_http(url, ready_selector, ready_text=None):
+    with throttle.request(url) as ticket:
+        try:
+            response = get_http_session().get(url, timeout=HTTP_TIMEOUT)
+        except requests.Timeout:
+            ticket.failed = True
+            return None
+        except requests.RequestException:
+            return None
+        ticket.record_status(response.status_code)
+    if response.status_code != 200:
+        return None
+    if not response.encoding or response.encoding.lower() == "iso-8859-1":
+        response.encoding = response.apparent_encoding
+    html = response.text
+
+    if ready_text and ready_text in html:
+        return html
+    if BeautifulSoup(html, "lxml").select_one(ready_selector) is None:
+        return None
+    return html
+
+
+def _fetch_selenium(url, ready_selector, timeout, ready_text=None, block_resources=True):
+    condition = EC.presence_of_element_located((By.CSS_SELECTOR, ready_selector))
+    if ready_text:
+        condition = EC.any_of(
+            condition,
+            EC.presence_of_element_located((By.XPATH, f"//*[contains(text(), '{ready_text}')]"))
+        )
+    try:
+        with get_shared_pool(size=_browser_pool_size).driver() as driver:
+            set_resource_blocking(driver, block_resources)
+            driver.get(url)
+            WebDriverWait(driver, timeout).until(condition)
+            return driver.page_source
+    except (TimeoutException, WebDriverException, FileNotFoundError) as e:
+        logger.warning(f"处理页面时出错: {url}, 错误: {e}")
+        return None
+
+
+def close_browsers():
+    """Shuts down whichever browser backends were started in this process."""
+    close_shared_pool()
+    if "playwright_fetcher" in sys.modules:
+        sys.modules["playwright_fetcher"].close_playwright_pool()
+
+
+def log_fetch_stats(log=None):
+    """Logs, per province, how many pages came over plain HTTP and how many needed the browser."""
+    log = log or logger
+    for host, limit in sorted(throttle.snapshot().items()):
+        log.info(f"📊 [{host}] 自适应并发上限: {limit}")
+    for province, counts in sorted(fetch_stats.snapshot().items()):
+        total = sum(counts.values())
+        fetched = total - counts["cache"]
+        if not total:
+            continue
+        fallback = fetched - counts["http"]
+        fallback_rate = fallback / fetched if fetched else 0.0
+        log.info(
+            f"📊 [{province}] 共 {total} 页: 缓存命中 {counts['cache']}, HTTP 直连 {counts['http']}, "
+            f"浏览器回退 {fallback} ({fallback_rate:.1%}), 其中失败 {counts['failed']}"
+        )
@@ -0,0 +1,73 @@
+# 详情页链接队列（插入时去重，保持首次出现顺序）
+# frontier.py
+
+import threading
+
+from url_builder import announcement_key
+
+
+class LinkFrontier:
+    """
+    An append-only, thread-safe list of detail links that de-duplicates on
+    insert using `url_builder.announcement_key`.
+
+    The list phase calls `add()` as it discovers links and `close()` when it is
+    done; the detail stage iterates the frontier and receives `(index, link)`
+    pairs in first-seen order as soon as they are added, blocking while the
+    frontier is still open and has nothing new.
+    """
+    def __init__(self):
+        self._links = []
+        self._seen = set()
+        self._closed = False
+        self.duplicates = 0
+        self._cond = threading.Condition()
+
+    def add(self, link):
+        """Adds `link` unless an equivalent link was already seen. Returns True if it was new."""
+        key = announcement_key(link)
+        with self._cond:
+            if key in self._seen:
+                self.duplicates += 1
+                return False
+            self._seen.add(key)
+            self._links.append(link)
+            self._cond.notify_all()
+            return True
+
+    def extend(self, links):
+        """Adds several links; returns how many of them were new."""
+        return sum(1 for link in links if self.add(link))
+
+    def close(self):
+        """Marks the frontier as complete so iterators stop once they have drained it."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        with self._cond:
+            return self._closed
+
+    def __len__(self):
+        with self._cond:
+            return len(self._links)
+
+    def links(self):
+        """Returns a snapshot of all links added so far, in first-seen order."""
+        with self._cond:
+            return list(self._links)
+
+    def __iter__(self):
+        position = 0
+        while True:
+            with self._cond:
+                while position >= len(self._links) and not self._closed:
+                    self._cond.wait()
+                if position >= len(self._links):
+                    return
+                batch = self._links[position:]
+            for link in batch:
+                position += 1
+                yield position, link
@@ -3,6 +3,7 @@ import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkcalendar import Calendar
 import threading
+import multiprocessing
 import queue
 import os
 from datetime import datetime
@@ -13,12 +14,14 @@ import traceback
 
 # Now that logger_config.py is created, we can import from it.
 from logger_config import QueueHandler
-from main import start_crawl_process
+from main import start_crawl_process, resume_crawl_process
+from checkpoint import list_checkpoints
 from converter import run_converter
 from report_generator import format_report_from_path
 from PIL import Image
 # Centralize province data by importing from the new mapping file
 from province_mapping import PROVINCE_PINYIN_MAP, get_chinese_province_list
+from config import DEFAULT_WORKERS
 
 
 # --- Helper Function for Pathing ---
@@ -44,7 +47,7 @@ class App(ctk.CTk):
         super().__init__()
 
         self.title("中国政府采购数据采集器")
-        self.geometry("700x650") # Increased height for progress bar
+        self.geometry("700x690") # Increased height for progress bar
 
         # --- Frame Setup ---
         self.grid_columnconfigure(0, weight=1)
@@ -56,7 +59,7 @@ class App(ctk.CTk):
 
         self.action_frame = ctk.CTkFrame(self)
         self.action_frame.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="ew")
-        self.action_frame.grid_columnconfigure((0, 1, 2), weight=1)
+        self.action_frame.grid_columnconfigure((0, 1, 2, 3), weight=1)
 
         self.progress_frame = ctk.CTkFrame(self)
         self.progress_frame.grid(row=2, column=0, padx=10, pady=0, sticky="ew")
@@ -106,15 +109,24 @@ class App(ctk.CTk):
         self.output_dir_label = ctk.CTkLabel(self.input_frame, text=f"保存在: {self.output_dir}", wraplength=450, justify="left")
         self.output_dir_label.grid(row=4, column=1, columnspan=2, padx=10, pady=10, sticky="w")
 
+        self.workers_label = ctk.CTkLabel(self.input_frame, text="并发数:")
+        self.workers_label.grid(row=5, column=0, padx=10, pady=5, sticky="w")
+        self.workers_menu = ctk.CTkOptionMenu(self.input_frame, values=["1", "2", "4", "8", "16"])
+        self.workers_menu.set(str(DEFAULT_WORKERS))
+        self.workers_menu.grid(row=5, column=1, columnspan=2, padx=10, pady=5, sticky="ew")
+
         # --- Action Widgets ---
         self.start_button = ctk.CTkButton(self.action_frame, text="开始爬取", command=self.start_crawling)
         self.start_button.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
 
+        self.resume_button = ctk.CTkButton(self.action_frame, text="继续上次任务", command=self.resume_crawling)
+        self.resume_button.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+
         self.convert_button = ctk.CTkButton(self.action_frame, text="将结果转为Excel", command=self.run_conversion)
-        self.convert_button.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        self.convert_button.grid(row=0, column=2, padx=5, pady=5, sticky="ew")
 
         self.format_button = ctk.CTkButton(self.action_frame, text="生成规范报告", command=self.start_formatting_thread, state="disabled")
-        self.format_button.grid(row=0, column=2, padx=5, pady=5, sticky="ew")
+        self.format_button.grid(row=0, column=3, padx=5, pady=5, sticky="ew")
         
         # --- Progress & Log Widgets ---
         self.progressbar = ctk.CTkProgressBar(self.progress_frame)
@@ -223,21 +235,53 @@ class App(ctk.CTk):
         keyword = self.keyword_entry.get().strip()
         start_date = self.start_date_entry.get()
         end_date = self.end_date_entry.get()
+        workers = int(self.workers_menu.get())
 
         if not all([province_pinyin, keyword, start_date, end_date]):
             messagebox.showerror("输入错误", "所有字段均为必填项。")
             return
 
         self.task_start("正在爬取...")
-        logging.info(f"🚀 开始爬取: 省份={province_chinese}, 关键词='{keyword}', 日期范围={start_date} to {end_date}")
+        logging.info(f"🚀 开始爬取: 省份={province_chinese}, 关键词='{keyword}', 日期范围={start_date} to {end_date}, 并发数={workers}")
 
         threading.Thread(
             target=self.run_crawl_task,
-            args=(province_pinyin, province_chinese, keyword, start_date, end_date),
+            args=(province_pinyin, province_chinese, keyword, start_date, end_date, workers),
+            daemon=True
+        ).start()
+
+    def resume_crawling(self):
+        """Continues the most recently checkpointed run that did not finish."""
+        checkpoints = list_checkpoints()
+        if not checkpoints:
+            messagebox.showinfo("继续任务", "没有可继续的未完成任务。")
+            return
+        state = checkpoints[0]
+        params = state["params"]
+        description = f"{params['province_cn']} - {params['keyword']}（{params['start_date']} 至 {params['end_date']}）"
+        if not messagebox.askyesno("继续任务", f"是否继续上次未完成的任务？\n{description}"):
+            return
+
+        self.last_raw_csv_path = None
+        workers = int(self.workers_menu.get())
+        self.task_start("正在继续爬取...")
+        logging.info(f"♻️ 继续爬取: {description}, 运行编号={state['run_id']}, 并发数={workers}")
+
+        threading.Thread(
+            target=self.run_resume_task,
+            args=(state["run_id"], workers),
             daemon=True
         ).start()
 
-    def run_crawl_task(self, province_pinyin, province_cn, keyword, start_date, end_date):
+    def run_resume_task(self, run_id, workers=DEFAULT_WORKERS):
+        try:
+            resume_crawl_process(run_id, log_queue=self.log_queue, workers=workers)
+        except Exception:
+            logging.error(f"继续爬取时发生严重错误")
+            logging.error(traceback.format_exc())
+            self.log_queue.put("CRAWL_FAILED")
+
+    def run_crawl_task(self, province_pinyin, province_cn, keyword, start_date, end_date, workers=DEFAULT_WORKERS):
         try:
             # Fix: Pass arguments in the correct order using keywords for clarity
             start_crawl_process(
@@ -247,7 +291,8 @@ class App(ctk.CTk):
                 start_date,
                 end_date,
                 output_dir=self.output_dir,
-                log_queue=self.log_queue
+                log_queue=self.log_queue,
+                workers=workers
             )
         except Exception:
             logging.error(f"爬取过程中发生严重错误")
@@ -304,6 +349,7 @@ class App(ctk.CTk):
     def task_start(self, status_text):
         """Generic function to disable buttons and show progress when a task starts."""
         self.start_button.configure(state="disabled")
+        self.resume_button.configure(state="disabled")
         self.convert_button.configure(state="disabled")
         self.format_button.configure(state="disabled")
         self.progressbar.grid(row=0, column=0, padx=10, pady=5, sticky="ew")
@@ -317,6 +363,7 @@ class App(ctk.CTk):
         self.progressbar.stop()
         self.progressbar.grid_forget()
         self.start_button.configure(state="normal")
+        self.resume_button.configure(state="normal")
         self.convert_button.configure(state="normal")
         # The format button is only enabled on crawl success, not here.
         if self.last_raw_csv_path and os.path.exists(self.last_raw_csv_path):
@@ -356,4 +403,5 @@ def main():
             pass # If even Tkinter fails, we've done all we can.
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
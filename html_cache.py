@@ -0,0 +1,175 @@
+# 本地 HTML 缓存（按内容寻址存储，带过期时间与 LRU 淘汰）
+# html_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from config import HTML_CACHE_DIR, HTML_CACHE_TTL, HTML_CACHE_MAX_BYTES
+from url_builder import canonicalize_url
+
+CACHE_MODES = ("off", "read", "write", "readwrite")
+
+
+class HtmlCache:
+    """
+    A persistent, content-addressed cache of fetched pages.
+
+    Entries are keyed by the canonical URL and point at a zlib-compressed body
+    stored under `blobs/` by the SHA-256 of its content, so identical pages are
+    stored once. An SQLite index keeps the URL, fetch time, HTTP status and last
+    access time of every entry. Entries older than `ttl` seconds are treated as
+    misses; once the stored bodies exceed `max_bytes`, the least recently used
+    entries are evicted. `ttl=None` / `max_bytes=None` disable expiry / eviction.
+
+    `mode` is one of "off", "read", "write" or "readwrite". The cache may be
+    shared by several processes (e.g. batch jobs); writes are serialised by
+    SQLite.
+    """
+    def __init__(self, cache_dir=HTML_CACHE_DIR, mode="readwrite", ttl=HTML_CACHE_TTL, max_bytes=HTML_CACHE_MAX_BYTES):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"未知的缓存模式: {mode}")
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        if mode != "off":
+            os.makedirs(os.path.join(cache_dir, "blobs"), exist_ok=True)
+            # 批量任务的多个进程共用同一个缓存：等待其他进程的写事务，而不是立即报 "database is locked"
+            self._conn = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    url_key      TEXT PRIMARY KEY,
+                    url          TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    status       INTEGER,
+                    fetched_at   REAL NOT NULL,
+                    last_access  REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS blobs (
+                    content_hash TEXT PRIMARY KEY,
+                    size         INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+                CREATE INDEX IF NOT EXISTS idx_entries_content_hash ON entries(content_hash);
+            """)
+            self._conn.commit()
+
+    @property
+    def readable(self):
+        return self.mode in ("read", "readwrite")
+
+    @property
+    def writable(self):
+        return self.mode in ("write", "readwrite")
+
+    @staticmethod
+    def url_key(url):
+        return hashlib.sha256(canonicalize_url(url).encode("utf-8")).hexdigest()
+
+    def _blob_path(self, content_hash):
+        return os.path.join(self.cache_dir, "blobs", content_hash[:2], content_hash + ".z")
+
+    def get(self, url, ttl=None):
+        """Returns the cached HTML for `url`, or None on a miss or expired entry."""
+        if not self.readable:
+            return None
+        ttl = self.ttl if ttl is None else ttl
+        key = self.url_key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, fetched_at FROM entries WHERE url_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            content_hash, fetched_at = row
+            if ttl is not None and time.time() - fetched_at > ttl:
+                return None
+            try:
+                with open(self._blob_path(content_hash), "rb") as f:
+                    html = zlib.decompress(f.read()).decode("utf-8")
+            except (OSError, zlib.error):
+                self._conn.execute("DELETE FROM entries WHERE url_key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE url_key = ?", (time.time(), key))
+            self._conn.commit()
+        return html
+
+    def put(self, url, html, status=200):
+        """Stores `html` as the current body of `url`, then enforces the size cap."""
+        if not self.writable or html is None:
+            return
+        data = html.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        with self._lock:
+            known = self._conn.execute(
+                "SELECT 1 FROM blobs WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+            if not known:
+                compressed = zlib.compress(data, 6)
+                path = self._blob_path(content_hash)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(compressed)
+                os.replace(tmp_path, path)
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs (content_hash, size) VALUES (?, ?)", (content_hash, len(compressed))
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (url_key, url, content_hash, status, fetched_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.url_key(url), url, content_hash, status, now, now),
+            )
+            self._conn.commit()
+            self._evict_locked()
+
+    def _evict_locked(self):
+        if self.max_bytes is None:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 先清理因页面内容更新而不再被引用的旧正文
+        orphans = self._conn.execute(
+            "SELECT content_hash FROM blobs WHERE content_hash NOT IN (SELECT content_hash FROM entries)"
+        ).fetchall()
+        for (content_hash,) in orphans:
+            total -= self._drop_blob_locked(content_hash)
+        if total > self.max_bytes:
+            for key, content_hash in self._conn.execute(
+                "SELECT url_key, content_hash FROM entries ORDER BY last_access"
+            ).fetchall():
+                self._conn.execute("DELETE FROM entries WHERE url_key = ?", (key,))
+                still_used = self._conn.execute(
+                    "SELECT 1 FROM entries WHERE content_hash = ? LIMIT 1", (content_hash,)
+                ).fetchone()
+                if not still_used:
+                    total -= self._drop_blob_locked(content_hash)
+                    if total <= self.max_bytes:
+                        break
+        self._conn.commit()
+
+    def _drop_blob_locked(self, content_hash):
+        row = self._conn.execute("SELECT size FROM blobs WHERE content_hash = ?", (content_hash,)).fetchone()
+        self._conn.execute("DELETE FROM blobs WHERE content_hash = ?", (content_hash,))
+        try:
+            os.remove(self._blob_path(content_hash))
+        except OSError:
+            pass
+        return row[0] if row else 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self.mode = "off"
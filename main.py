@@ -1,28 +1,54 @@
 import time
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from urllib3.exceptions import MaxRetryError
 import importlib
+import hashlib
 import os
+import sys
 import traceback
 import argparse
-import logging
+import threading
+import multiprocessing
 
+from config import OUTPUT_FORMAT, PARQUET_DATASET_DIR, RESULT_STORE_PATH, DEFAULT_WORKERS, PARSE_WORKERS, PARSE_PROCESSES, DRIVER_POOL_SIZE, PLAYWRIGHT_PAGE_POOL_SIZE, BROWSER_BACKEND, BLOCK_RESOURCES, HTML_CACHE_MODE
 from province_mapping import get_province_pinyin
 from logger_config import get_logger, QueueHandler
-from report_generator import create_formatted_report
-from url_builder import build_ccgp_search_url
-from driver_setup import get_webdriver
+from query_planner import QueryPlanner
+from frontier import LinkFrontier
+from pipeline import CrawlPipeline
+from parse_pool import ParsePool
+from seen_index import SeenIndex, parser_version, parser_fingerprint, PARSER_FINGERPRINT_FIELD
+from text_index import TextIndex
+from page_archive import PageArchive
+from checkpoint import Checkpoint, list_checkpoints
+from sinks import open_sink, SINK_FORMATS
+from fetcher import fetch_stats, log_fetch_stats, set_browser_backend, set_block_resources, close_browsers, BROWSER_BACKENDS, configure_cache
+from html_cache import CACHE_MODES
 
 
-def start_crawl_process(province_pinyin, province_cn, keyword, start_date, end_date, output_dir='output', log_queue=None):
+def start_crawl_process(province_pinyin, province_cn, keyword, start_date, end_date, output_dir='output', log_queue=None,
+                        workers=DEFAULT_WORKERS, backend=BROWSER_BACKEND, block_resources=BLOCK_RESOURCES,
+                        cache_mode=HTML_CACHE_MODE, parse_workers=PARSE_WORKERS, parse_processes=PARSE_PROCESSES,
+                        keep_browsers=False, incremental=False, resume_run_id=None, output_format=OUTPUT_FORMAT,
+                        parquet_dir=None, store_path=None, text_index=True, archive=True, browser_pool_size=None):
     """
     重构后的主流程，负责处理列表页抓取和详情页解析调度。
+
+    - workers: 详情页流水线中的并发抓取线程数。
+    - parse_workers: 详情页流水线中的解析线程数。
+    - parse_processes: 大于 0 时，解析在独立的进程池中进行（带超时与崩溃隔离），解析线程数随之提高到不少于进程数。
+    - backend: HTTP 直连失败时使用的浏览器后端 ("selenium" 或 "playwright")。
+    - browser_pool_size: 浏览器后端最多同时打开的驱动/页面数。未指定时 Selenium 取 DRIVER_POOL_SIZE 与 workers 中的较大者，
+      Playwright 取 PLAYWRIGHT_PAGE_POOL_SIZE。
+    - block_resources: 浏览器是否拦截图片、字体、样式表等静态资源。
+    - cache_mode: 本地 HTML 缓存模式 (off/read/write/readwrite)。
+    - keep_browsers: 任务结束后不关闭浏览器，供批量任务在同一进程中复用。
+    - incremental: 增量模式，跳过已抓取公告索引中已有的详情页，只输出新记录；结果保存后再更新索引。
+      省份解析器源码改动过（解析器指纹不同）的已抓取公告会重新处理，优先使用页面存档而不重新下载。
+    - output_format: 结果文件格式 (csv 或 jsonl)，边解析边写入 <文件名>.part，结束时原子地重命名为最终文件。
+    - parquet_dir: 同时把记录写入该目录下按 省份/发布月份 分区的 Parquet 数据集（需要安装 pyarrow），运行成功后一次性追加。
+    - store_path: 同时把记录写入该 SQLite 结果库（按 链接+条目序号 覆盖写入，可用 python main.py query 查询）。
+    - text_index: 把每个详情页的正文写入本地全文索引，换关键词时可用 python main.py search-local 检索已抓取的公告。
+    - archive: 把每个详情页永久存档并记录解析结果，修复解析器后可用 python main.py reparse 离线重新解析。
+    - resume_run_id: 从该运行的检查点继续，跳过已完成的列表窗口和已写出的详情页。每次运行都会定期保存检查点，成功保存结果后自动删除。
     """
     # 1. Setup Logger
     logger = get_logger(f"crawler.{province_pinyin}")
@@ -32,11 +58,19 @@ def start_crawl_process(province_pinyin, province_cn, keyword, start_date, end_d
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
+    workers = max(1, int(workers))
+    parse_workers = max(1, int(parse_workers))
+    parse_processes = max(0, int(parse_processes))
+    if parse_processes:
+        parse_workers = max(parse_workers, parse_processes)
+
     safe_province_name = province_cn.replace(" ", "_")
-    filename = os.path.join(output_dir, f"{safe_province_name}_{keyword}_{start_date}_to_{end_date}.csv")
+    base_path = os.path.join(output_dir, f"{safe_province_name}_{keyword}_{start_date}_to_{end_date}")
+    filename = f"{base_path}.{output_format}"
     
     logger.info(f"准备开始抓取: {province_cn} - {keyword}")
     logger.info(f"日期范围: {start_date} to {end_date}")
+    logger.info(f"详情页并发数: 抓取 {workers} / 解析 {parse_workers}" + (f"（{parse_processes} 个解析进程）" if parse_processes else ""))
     logger.info(f"结果将保存至: {filename}")
 
     # 2. 动态加载省份解析模块
@@ -50,135 +84,343 @@ def start_crawl_process(province_pinyin, province_cn, keyword, start_date, end_d
         logger.error(f"详细错误: {e}")
         if log_queue: log_queue.put("CRAWL_FAILED")
         return
+    # 解析器指纹：省份解析器源码的哈希，随每条记录保存，解析器修改后据此找出需要重新解析的公告
+    fingerprint = parser_fingerprint(province_pinyin)
             
-    # 3. 初始化Selenium WebDriver
-    all_results = []
-    driver = None
+    # 检查点：新运行创建，续爬时加载上次保存的进度
+    params = {
+        "province_pinyin": province_pinyin, "province_cn": province_cn, "keyword": keyword,
+        "start_date": start_date, "end_date": end_date, "output_dir": output_dir,
+    }
     try:
-        try:
-            driver = get_webdriver()
-        except (WebDriverException, FileNotFoundError) as e:
-            logger.error(f"无法启动WebDriver: {e}")
-            logger.error("请确保 'assets/chromedriver.exe' 存在且版本兼容。")
-            if log_queue: log_queue.put("CRAWL_FAILED")
-            return
-
-        # 4. 循环抓取所有列表页，获取详情页链接
-        page = 1
-        all_detail_links = []
-        while True:
-            search_url = build_ccgp_search_url(province_cn, start_date, end_date, keyword, page)
-            logger.info(f"\n📄 正在抓取列表页 第 {page} 页...")
-            driver.get(search_url)
+        checkpoint = Checkpoint.load(resume_run_id) if resume_run_id else Checkpoint.create(params)
+    except (OSError, ValueError) as e:
+        logger.error(f"错误：无法加载运行 '{resume_run_id}' 的检查点: {e}")
+        if log_queue: log_queue.put("CRAWL_FAILED")
+        return
+    logger.info(f"{'♻️ 从检查点继续' if resume_run_id else '运行编号'}: {checkpoint.run_id}")
 
+    fetch_stats.reset()
+
+    # 3. 选择浏览器后端（HTTP 直连失败时用于渲染页面，列表页与详情页共用）
+    sink = None
+    extra_sinks = []
+    parse_pool = None
+    seen_index = SeenIndex() if incremental else None
+    page_index = TextIndex() if text_index else None
+    page_archive = PageArchive() if archive else None
+    fetched = {}        # 链接序号 -> 索引条目（成功抓取且解析未出错的详情页）
+    seen_entries = []   # 本次新处理的公告，结果保存后写入索引
+    skipped = []
+    reparsed = []       # 增量模式下因解析器指纹变化而重新处理的公告
+    if browser_pool_size is None and backend == "selenium":
+        # 每个抓取线程渲染页面时独占一个 ChromeDriver；Playwright 页面池未指定大小时使用 PLAYWRIGHT_PAGE_POOL_SIZE
+        browser_pool_size = max(DRIVER_POOL_SIZE, workers)
+    set_browser_backend(backend, pool_size=browser_pool_size)
+    set_block_resources(block_resources)
+    configure_cache(cache_mode)
+    logger.info(f"浏览器后端: {backend}，资源拦截: {'开启' if block_resources else '关闭'}，缓存模式: {cache_mode}")
+    try:
+        # 4. 在后台线程中抓取所有列表页：命中数过多的日期窗口自动二分，各窗口并发抓取，发现的链接即时去重后放入队列
+        frontier = LinkFrontier()
+        list_errors = []
+        restored = checkpoint.restore(frontier)
+        # 结果边解析边写出；续爬时先写回已完成部分的记录
+        sink = open_sink(base_path, output_format)
+        if parquet_dir:
+            from parquet_sink import ParquetSink
+            extra_sinks.append(ParquetSink(parquet_dir, run_id=checkpoint.run_id))
+        if store_path:
+            from result_store import ResultStore
+            extra_sinks.append(ResultStore(store_path, run_id=checkpoint.run_id))
+        for line in restored:
+            for s in [sink] + extra_sinks:
+                s.write(line["records"])
+            if line.get("seen"):
+                seen_entries.append(line["seen"])
+        done = len(restored)
+        if resume_run_id:
+            logger.info(f"♻️ 已恢复 {done} 个已处理的详情页（{sink.count} 条记录），待处理链接 {len(frontier) - done} 个。")
+
+        def crawl_list_pages():
             try:
-                WebDriverWait(driver, 10).until(
-                    EC.any_of(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, ".vT-srch-result-list-bid li a")),
-                        EC.presence_of_element_located((By.XPATH, "//*[contains(text(), '抱歉，没有找到相关数据')]"))
-                    )
-                )
-
-                if "抱歉，没有找到相关数据" in driver.page_source:
-                    if page == 1:
-                        logger.info("📭 在起始页未找到任何数据，任务提前结束。")
-                    else:
-                        logger.info("✅ 已到达结果末尾，列表抓取完成。")
-                    break
-
-                link_elements = driver.find_elements(By.CSS_SELECTOR, ".vT-srch-result-list-bid li a")
-                page_links = [link.get_attribute('href') for link in link_elements if link.get_attribute('href')]
-                
-                if not page_links:
-                    logger.info("📭 当前页没有找到链接，可能已是最后一页。")
-                    break
-                
-                all_detail_links.extend(page_links)
-                logger.info(f"    找到 {len(page_links)} 个链接，累计 {len(all_detail_links)} 个。")
-
-                next_button = driver.find_element(By.LINK_TEXT, "下一页")
-                driver.execute_script("arguments[0].click();", next_button)
-                page += 1
-                time.sleep(2)
-            except TimeoutException:
-                logger.info("📭 页面加载超时或未找到结果列表，结束列表抓取。")
-                break
-            except NoSuchElementException:
-                logger.info("✅ 没有'下一页'按钮，列表抓取完成。")
-                break
-
-        # 5. 遍历详情页链接，进行解析
-        unique_links = sorted(list(set(all_detail_links)), key=lambda x: all_detail_links.index(x))
-        logger.info(f"\n🔎 开始处理 {len(unique_links)} 个详情页链接...")
-        
-        if not unique_links:
-             logger.info("🤷‍♀️ 未收集到任何详情页链接，任务结束。")
-        
-        for i, link in enumerate(unique_links, 1):
-            logger.info(f"    🔗 [{i}/{len(unique_links)}] 正在处理...")
+                if checkpoint.list_done:
+                    logger.info("♻️ 列表页已在上次运行中抓取完成，跳过列表阶段。")
+                    return
+                QueryPlanner(province_cn, keyword, frontier, logger).run(
+                    start_date, end_date, skip=checkpoint.completed_windows, on_window_done=checkpoint.mark_window_done)
+                checkpoint.mark_list_done()
+            except Exception as e:
+                list_errors.append(e)
+                logger.error(f"列表页抓取出错: {e}")
+                logger.error(traceback.format_exc())
+            finally:
+                frontier.close()
+
+        list_thread = threading.Thread(target=crawl_list_pages, name="list-crawler", daemon=True)
+        list_thread.start()
+
+        # 5. 详情页流水线：链接队列 → 抓取线程 → 解析线程 → 写出，各阶段之间为有界队列，
+        #    不等待列表页结束，边发现链接边处理
+        logger.info("\n🔎 详情页流水线已启动，将随列表页进度处理新发现的链接...")
+
+        def fetch_link(i, link):
             parser_instance = get_parser_for_url(link)
             if not parser_instance:
-                logger.warning(f"        [警告] 未能为链接找到合适的解析器，已跳过。")
-                continue
-
-            html = get_dynamic_html(link)
+                logger.warning(f"    [#{i}] [警告] 未能为链接找到合适的解析器，已跳过。")
+                return None
+            html = None
+            if seen_index:
+                seen = seen_index.get(link)
+                # 旧版本索引中没有指纹的条目视为未变化
+                if seen and seen["parser_fingerprint"] in (None, fingerprint):
+                    skipped.append(link)
+                    return None
+                if seen:
+                    reparsed.append(link)
+                    html = page_archive.get(link) if page_archive else None
+            html = html or get_dynamic_html(link)
             if not html:
-                logger.warning(f"        [警告] 未能获取页面内容，已跳过。")
-                continue
+                logger.warning(f"    [#{i}] [警告] 未能获取页面内容，已跳过。")
+                return None
+            if page_archive:
+                try:
+                    page_archive.put(link, province_pinyin, html)
+                except OSError as e:
+                    logger.warning(f"    [#{i}] [警告] 页面存档失败: {e}")
+            fetched[i] = {
+                "url": link,
+                "province": province_pinyin,
+                "content_hash": hashlib.sha256(html.encode("utf-8")).hexdigest(),
+                "parser_version": parser_version(parser_instance),
+                "parser_fingerprint": fingerprint,
+            }
+            return html
 
+        def parse_link(i, link, html):
+            if not html:
+                return []
+            if page_index:
+                try:
+                    page_index.add(link, province_pinyin, html)
+                except Exception as e:
+                    logger.warning(f"    [#{i}] [警告] 写入全文索引失败: {e}")
             try:
-                parsed_data = parser_instance.parse(html)
-                if parsed_data:
-                    for item in parsed_data:
-                        item["链接"] = link
-                        item["省份"] = province_cn
-                    all_results.extend(parsed_data)
-                    logger.info(f"        ✅ 解析成功，获得 {len(parsed_data)} 条记录。")
+                if parse_pool:
+                    parsed_data = parse_pool.parse(province_pinyin, link, html)
                 else:
-                    logger.info(f"        [提示] 解析器返回空，页面可能无有效信息。")
+                    parsed_data = get_parser_for_url(link).parse(html)
             except Exception as e:
-                logger.error(f"        ❌ 解析时发生错误: {e}")
+                fetched.pop(i, None)
+                logger.error(f"    [#{i}] ❌ 解析时发生错误: {e}")
+                return []
+            if not parsed_data:
+                logger.info(f"    [#{i}] [提示] 解析器返回空，页面可能无有效信息。")
+                return []
+            for item in parsed_data:
+                item["链接"] = link
+                item["省份"] = province_cn
+                item[PARSER_FINGERPRINT_FIELD] = fingerprint
+            return parsed_data
+
+        def write_records(i, link, records):
+            total = f"{len(frontier)}" if frontier.closed else f"{len(frontier)}+"
+            entry = fetched.pop(i, None)
+            if entry:
+                entry = dict(entry, record_count=len(records))
+                seen_entries.append(entry)
+                if page_archive:
+                    page_archive.record_results([(link, records, fingerprint)])
+            checkpoint.record_written(i, link, records, seen=entry)
+            if records:
+                for s in [sink] + extra_sinks:
+                    s.write(records)
+                logger.info(f"    🔗 [{i}/{total}] 解析成功，获得 {len(records)} 条记录。")
+            else:
+                logger.info(f"    🔗 [{i}/{total}] 处理完毕，无记录。")
+
+        if parse_processes:
+            parse_pool = ParsePool(parse_processes)
+
+        pipeline = CrawlPipeline(
+            fetch=fetch_link,
+            parse=parse_link,
+            write=write_records,
+            fetch_workers=workers,
+            parse_workers=parse_workers,
+            logger=logger,
+        )
+        pipeline.run((i, link) for i, link in frontier if i > done)
+
+        list_thread.join()
+        if list_errors:
+            raise list_errors[0]
+
+        logger.info(f"\n🔎 共处理 {len(frontier)} 个详情页链接（列表页重复链接 {frontier.duplicates} 个已去重）。")
+        if seen_index:
+            logger.info(f"♻️ 增量模式：跳过 {len(skipped)} 个已抓取过的公告，新处理 {len(seen_entries)} 个"
+                        f"（其中 {len(reparsed)} 个因解析器已修改而重新解析）。")
+        if not len(frontier):
+            logger.info("🤷‍♀️ 未收集到任何详情页链接，任务结束。")
 
     except Exception as e:
         logger.error(f"抓取过程中发生未知严重错误: {e}")
         logger.error(f"详细堆栈信息: {traceback.format_exc()}")
+        logger.error(f"进度已保存，可使用 --resume {checkpoint.run_id} 继续。")
+        for s in ([sink] if sink else []) + extra_sinks:
+            s.abort()
         if log_queue: log_queue.put("CRAWL_FAILED")
+        if seen_index: seen_index.close()
         return
     finally:
-        if driver:
-            driver.quit()
-
-    # 6. 保存结果
-    if all_results:
-        df = pd.DataFrame(all_results)
-        standard_columns = [
-            "发布日期", "项目号", "采购方式", "项目名称", "供应商名称",
-            "中标金额", "名称", "品牌", "规格型号", "数量", "单价",
-            "链接", "省份"
-        ]
-        final_columns = [col for col in standard_columns if col in df.columns]
-        df = df[final_columns]
-        df.to_csv(filename, index=False, encoding='utf-8-sig', na_rep='N/A')
-        logger.info(f"\n🎉 成功抓取 {len(all_results)} 条数据，已保存到 {filename}")
-        if log_queue: log_queue.put(f"CRAWL_SUCCESS:{filename}")
+        # 无论成功、出错还是被中断，都先把最新进度写入检查点
+        checkpoint.save()
+        checkpoint.close()
+        if parse_pool:
+            parse_pool.close()
+        if page_index:
+            page_index.close()
+        if page_archive:
+            page_archive.close()
+        if not keep_browsers:
+            close_browsers()
+        log_fetch_stats(logger)
+
+    # 6. 完成结果文件（.part 原子重命名为最终文件）。先完成主结果文件，Parquet/结果库出错时不影响它
+    try:
+        saved = sink.close()
+    except Exception as e:
+        logger.error(f"保存结果文件失败: {e}")
+        for s in extra_sinks:
+            s.abort()
+        if log_queue: log_queue.put("CRAWL_FAILED")
+        if seen_index: seen_index.close()
+        return
+    failed_sinks = []
+    for s in extra_sinks:
+        try:
+            if s.close():
+                logger.info(f"🗂️ {s.count} 条数据已写入 {s.path}")
+        except Exception as e:
+            logger.error(f"写入 {s.path} 失败: {e}")
+            failed_sinks.append(s)
+    if saved:
+        logger.info(f"\n🎉 成功抓取 {sink.count} 条数据，已保存到 {filename}")
     else:
         logger.info("\n🤷‍♀️ 本次任务未找到任何可解析的数据。")
+    if failed_sinks:
+        # 不更新已抓取索引：下次增量运行会重新处理这些公告，补全写入失败的输出
+        logger.error(f"⚠️ {len(failed_sinks)} 个附加输出写入失败，本次任务视为失败。")
+        if log_queue: log_queue.put("CRAWL_FAILED")
+        if seen_index: seen_index.close()
+        checkpoint.finish()
+        return
+    if saved and log_queue: log_queue.put(f"CRAWL_SUCCESS:{filename}")
+
+    # 结果写出后再更新已抓取索引，避免中途失败时丢失的公告在下次增量运行中被跳过
+    if seen_index:
+        seen_index.record_many(seen_entries)
+        seen_index.close()
+    checkpoint.finish()
 
     if log_queue: log_queue.put("CRAWL_COMPLETE")
     return filename
 
 
+def resume_crawl_process(run_id, log_queue=None, **kwargs):
+    """从检查点继续运行 `run_id`，抓取参数取自检查点，其余参数同 start_crawl_process。"""
+    params = Checkpoint.load(run_id).params
+    return start_crawl_process(
+        params["province_pinyin"],
+        params["province_cn"],
+        params["keyword"],
+        params["start_date"],
+        params["end_date"],
+        params["output_dir"],
+        log_queue=log_queue,
+        resume_run_id=run_id,
+        **kwargs
+    )
+
+
 def main():
-    parser = argparse.ArgumentParser(description="政府采购数据爬虫")
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        # 批量任务: python main.py batch jobs.json [选项]
+        from batch_runner import main as batch_main
+        return batch_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "compact":
+        # 合并 Parquet 数据集各分区中的小文件: python main.py compact [DIR]
+        from parquet_sink import compact_dataset
+        dataset_dir = sys.argv[2] if len(sys.argv) > 2 else PARQUET_DATASET_DIR
+        print(f"🗜️ 已合并 {compact_dataset(dataset_dir)} 个分区。")
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "search-local":
+        # 在已抓取公告的正文中检索: python main.py search-local 多联机 [--parse]
+        from text_index import main as search_main
+        return search_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "reparse":
+        # 用当前的解析器离线重新解析页面存档: python main.py reparse [--province 浙江]
+        from reparse import main as reparse_main
+        return reparse_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "query":
+        # 查询结果库: python main.py query --supplier 某某公司 --since 2025-04-01
+        from result_store import main as query_main
+        return query_main(sys.argv[2:])
+
+    parser = argparse.ArgumentParser(description="政府采购数据爬虫", epilog="批量任务请使用: python main.py batch jobs.json；合并 Parquet 小文件: python main.py compact [DIR]；查询结果库: python main.py query --help；本地检索: python main.py search-local --help；离线重新解析: python main.py reparse --help")
     parser.add_argument("--province", help="省份拼音")
     parser.add_argument("--keyword", help="关键词")
     parser.add_argument("--start_date", help="开始日期 (YYYY-MM-DD)")
     parser.add_argument("--end_date", help="结束日期 (YYYY-MM-DD)")
     parser.add_argument("--output", default="output", help="输出目录")
+    parser.add_argument("--backend", choices=BROWSER_BACKENDS, default=BROWSER_BACKEND, help=f"浏览器后端 (默认 {BROWSER_BACKEND})")
+    parser.add_argument("--browser-pool-size", type=int, help=f"浏览器后端最多同时打开的驱动/页面数 (默认 Selenium 为 max({DRIVER_POOL_SIZE}, --workers)，Playwright 为 {PLAYWRIGHT_PAGE_POOL_SIZE})")
+    parser.add_argument("--no-block-resources", dest="block_resources", action="store_false", default=BLOCK_RESOURCES, help="不拦截浏览器中的图片、字体、样式表和统计脚本")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, default=HTML_CACHE_MODE, help=f"本地 HTML 缓存模式 (默认 {HTML_CACHE_MODE})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"详情页并发抓取线程数 (默认 {DEFAULT_WORKERS})")
+    parser.add_argument("--parse-processes", type=int, default=PARSE_PROCESSES, help=f"使用多进程解析的进程数，0 表示在线程内解析 (默认 {PARSE_PROCESSES})")
+    parser.add_argument("--format", dest="output_format", choices=SINK_FORMATS, default=OUTPUT_FORMAT, help=f"结果文件格式 (默认 {OUTPUT_FORMAT})")
+    parser.add_argument("--parquet", nargs="?", const=PARQUET_DATASET_DIR, metavar="DIR", help=f"同时写入按省份/发布月份分区的 Parquet 数据集 (默认目录 {PARQUET_DATASET_DIR})")
+    parser.add_argument("--store", nargs="?", const=RESULT_STORE_PATH, metavar="DB", help=f"同时写入 SQLite 结果库，可用 python main.py query 查询 (默认 {RESULT_STORE_PATH})")
+    parser.add_argument("--no-text-index", dest="text_index", action="store_false", help="不把详情页正文写入本地全文索引")
+    parser.add_argument("--no-archive", dest="archive", action="store_false", help="不把详情页保存到页面存档")
+    parser.add_argument("--resume", metavar="RUN_ID", help="从检查点继续之前中断的运行（使用 --resume list 查看可继续的运行）")
+    parser.add_argument("--incremental", action="store_true", help="增量模式：跳过已抓取过的公告，只输出新记录")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS, help=f"详情页解析线程数 (默认 {PARSE_WORKERS})")
     args = parser.parse_args()
 
-    # Setup a general logger for the main script
-    cli_logger = get_logger("main_cli")
+    if args.workers < 1 or args.parse_workers < 1:
+        parser.error("--workers 和 --parse-workers 必须大于等于 1")
+    if args.browser_pool_size is not None and args.browser_pool_size < 1:
+        parser.error("--browser-pool-size 必须大于等于 1")
+
+    options = dict(
+        workers=args.workers,
+        backend=args.backend,
+        browser_pool_size=args.browser_pool_size,
+        block_resources=args.block_resources,
+        cache_mode=args.cache_mode,
+        parse_workers=args.parse_workers,
+        parse_processes=args.parse_processes,
+        incremental=args.incremental,
+        output_format=args.output_format,
+        parquet_dir=args.parquet,
+        store_path=args.store,
+        text_index=args.text_index,
+        archive=args.archive
+    )
+
+    if args.resume == "list":
+        for state in list_checkpoints():
+            p = state["params"]
+            saved_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(state.get("saved_at", 0)))
+            print(f"{state['run_id']}  {p['province_cn']} {p['keyword']} {p['start_date']}~{p['end_date']}  保存于 {saved_at}")
+        return
+    if args.resume:
+        try:
+            return resume_crawl_process(args.resume, **options)
+        except (OSError, ValueError) as e:
+            parser.error(f"无法加载运行 '{args.resume}' 的检查点: {e}")
 
     if not all([args.province, args.keyword, args.start_date, args.end_date]):
         parser.error("执行爬取任务时，必须提供 --province, --keyword, --start_date, 和 --end_date 参数。")
@@ -195,8 +437,10 @@ def main():
         args.start_date,
         args.end_date,
         args.output,
-        log_queue=None 
+        log_queue=None,
+        **options
     )
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
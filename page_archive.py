@@ -0,0 +1,158 @@
+# 页面存档：永久保存每个抓取到的详情页及其解析结果，解析器修复后可离线重新解析
+# page_archive.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from config import PAGE_ARCHIVE_DIR
+from seen_index import PARSER_FINGERPRINT_FIELD
+from url_builder import announcement_key
+
+
+def records_hash(records):
+    """
+    A stable SHA-256 of a page's records, used to tell whether re-parsing
+    changed them. The parser fingerprint tag is left out, so editing a parser
+    without changing its output does not count as a change.
+    """
+    records = [{k: v for k, v in r.items() if k != PARSER_FINGERPRINT_FIELD} for r in records]
+    data = json.dumps(records, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class PageArchive:
+    """
+    A permanent, content-addressed archive of fetched detail pages.
+
+    Unlike the HTML cache, entries never expire and are never evicted. Each
+    announcement (keyed by `url_builder.announcement_key`) points at the
+    zlib-compressed body of its latest fetch, stored under `blobs/` by its
+    SHA-256, and keeps the records last parsed from it together with the
+    fingerprint of the parser that produced them, so a re-parse can skip
+    pages whose parser is unchanged and report which records changed. The
+    index may be shared by several processes; writes are serialised by SQLite.
+    """
+    def __init__(self, archive_dir=PAGE_ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(archive_dir, "blobs"), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(archive_dir, "index.sqlite"), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key          TEXT PRIMARY KEY,
+                url          TEXT NOT NULL,
+                province     TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                fetched_at   REAL NOT NULL,
+                records      TEXT,
+                records_hash TEXT,
+                parsed_at    REAL,
+                parser_fingerprint TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_pages_province ON pages(province);
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}
+        if "parser_fingerprint" not in columns:
+            self._conn.execute("ALTER TABLE pages ADD COLUMN parser_fingerprint TEXT")
+        self._conn.commit()
+
+    def _blob_path(self, content_hash):
+        return os.path.join(self.archive_dir, "blobs", content_hash[:2], content_hash + ".z")
+
+    def put(self, url, province, html):
+        """Archives `html` as the latest body of `url` (province in pinyin)."""
+        data = html.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(data, 6))
+            os.replace(tmp_path, path)
+        with self._lock:
+            # 页面内容未变时保留上次的解析结果
+            self._conn.execute(
+                "INSERT INTO pages (key, url, province, content_hash, fetched_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET url = excluded.url, province = excluded.province, "
+                "fetched_at = excluded.fetched_at, content_hash = excluded.content_hash, "
+                "records = CASE WHEN content_hash = excluded.content_hash THEN records END, "
+                "records_hash = CASE WHEN content_hash = excluded.content_hash THEN records_hash END, "
+                "parser_fingerprint = CASE WHEN content_hash = excluded.content_hash THEN parser_fingerprint END",
+                (announcement_key(url), url, province, content_hash, time.time()),
+            )
+            self._conn.commit()
+        return content_hash
+
+    def read(self, content_hash):
+        """Returns the archived HTML with the given content hash, or None if its blob is missing."""
+        try:
+            with open(self._blob_path(content_hash), "rb") as f:
+                return zlib.decompress(f.read()).decode("utf-8")
+        except (OSError, zlib.error):
+            return None
+
+    def get(self, url):
+        """Returns the archived HTML of `url`, or None if it has not been archived."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM pages WHERE key = ?", (announcement_key(url),)
+            ).fetchone()
+        return self.read(row[0]) if row else None
+
+    def record_results(self, entries):
+        """
+        Stores the records parsed from archived pages. `entries` is an
+        iterable of (url, records, parser fingerprint) tuples.
+        """
+        now = time.time()
+        rows = [
+            (json.dumps(records, ensure_ascii=False, default=str), records_hash(records), now, fingerprint,
+             announcement_key(url))
+            for url, records, fingerprint in entries
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE pages SET records = ?, records_hash = ?, parsed_at = ?, parser_fingerprint = ? WHERE key = ?", rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def pages(self, provinces=None):
+        """
+        Lists the archived pages (optionally only those of `provinces`, in
+        pinyin) as dicts with url, province, content_hash, records (the last
+        parsed records, or None), records_hash and parser_fingerprint, ordered
+        by fetch time.
+        """
+        sql = "SELECT url, province, content_hash, records, records_hash, parser_fingerprint FROM pages"
+        params = list(provinces or [])
+        if params:
+            sql += f" WHERE province IN ({', '.join('?' * len(params))})"
+        sql += " ORDER BY fetched_at"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {"url": url, "province": province, "content_hash": content_hash,
+             "records": json.loads(records) if records is not None else None, "records_hash": old_hash,
+             "parser_fingerprint": fingerprint}
+            for url, province, content_hash, records, old_hash, fingerprint in rows
+        ]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
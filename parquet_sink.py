@@ -0,0 +1,224 @@
+# Parquet 输出：按 省份/发布月份 分区的列式数据集，支持追加写入与小文件合并（合并时去除重复抓取的记录）
+# parquet_sink.py
+
+import datetime
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from config import PARQUET_DATASET_DIR, PARQUET_BATCH_ROWS
+from utils import parse_date, parse_number
+
+PARTITION_COLUMNS = ["省份", "发布月份"]
+# 分区列保存在目录名中（hive 风格：省份=广东/发布月份=2025-06），不写入文件本身
+SCHEMA = pa.schema([
+    ("发布日期", pa.date32()),
+    ("项目号", pa.string()),
+    ("采购方式", pa.dictionary(pa.int32(), pa.string())),
+    ("项目名称", pa.string()),
+    ("供应商名称", pa.string()),
+    ("中标金额", pa.float64()),
+    ("名称", pa.string()),
+    ("品牌", pa.string()),
+    ("规格型号", pa.string()),
+    ("数量", pa.float64()),
+    ("单价", pa.float64()),
+    ("链接", pa.string()),
+    # 记录在所属公告中的序号及写入时间：同一公告被重新抓取后，合并时只保留最新写入的条目
+    ("item_index", pa.int32()),
+    ("updated_at", pa.timestamp("ms")),
+])
+UNKNOWN_PARTITION = "未知"
+STAGING_DIR = "_staging"
+
+def _partition_value(value):
+    # 目录名中不能出现路径分隔符
+    text = str(value or "").strip().replace("/", "_").replace("\\", "_")
+    return text or UNKNOWN_PARTITION
+
+
+def to_row(record, item_index=None, updated_at=None):
+    """Converts a crawl record into a typed row plus its (省份, 发布月份) partition key."""
+    published = parse_date(record.get("发布日期"))
+    row = {}
+    for field in SCHEMA:
+        value = record.get(field.name)
+        if field.name == "item_index":
+            value = item_index
+        elif field.name == "updated_at":
+            value = updated_at
+        elif field.name == "发布日期":
+            value = published
+        elif pa.types.is_floating(field.type):
+            value = parse_number(value)
+        elif value is not None:
+            value = str(value)
+        row[field.name] = value
+    month = published.strftime("%Y-%m") if published else UNKNOWN_PARTITION
+    return row, (_partition_value(record.get("省份")), month)
+
+
+def _partition_dir(root, key):
+    return os.path.join(root, *(f"{column}={value}" for column, value in zip(PARTITION_COLUMNS, key)))
+
+
+class ParquetSink:
+    """
+    Writes crawl records into a hive-partitioned Parquet dataset
+    (`<dataset_dir>/省份=<省份>/发布月份=<YYYY-MM>/*.parquet`) with typed
+    columns: 发布日期 as a date, amounts and quantities as floats, 采购方式 as a
+    dictionary-encoded (categorical) column. Each row also carries its
+    item_index (its position among the records of its announcement) and the
+    time it was written.
+
+    Records are buffered per partition and written every `batch_rows` rows
+    into a staging area for this run (`<dataset_dir>/_staging/<run_id>/`,
+    which dataset readers ignore). `close()` moves the staged files into the
+    dataset, so a run's data is appended all at once; a run that is resumed
+    with the same `run_id` starts its staging area afresh. Has the same
+    write/close/abort interface as the CSV/JSONL sinks.
+
+    The dataset is append-only: re-crawling an announcement adds its records
+    again. `compact_dataset` drops the superseded copies, keeping only the
+    latest write of each announcement.
+    """
+    def __init__(self, dataset_dir=PARQUET_DATASET_DIR, run_id=None, batch_rows=PARQUET_BATCH_ROWS):
+        self.dataset_dir = dataset_dir
+        self.path = dataset_dir
+        self.run_id = run_id or uuid.uuid4().hex
+        self.batch_rows = batch_rows
+        self.count = 0
+        self._buffers = {}
+        self._buffered = 0
+        self._file_seq = 0
+        self._lock = threading.Lock()
+        self.staging_dir = os.path.join(dataset_dir, STAGING_DIR, self.run_id)
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def write(self, records):
+        if not records:
+            return
+        now = datetime.datetime.now()
+        with self._lock:
+            positions = {}
+            for record in records:
+                link = str(record.get("链接") or "")
+                item_index = positions.get(link, 0)
+                positions[link] = item_index + 1
+                row, key = to_row(record, item_index, now)
+                self._buffers.setdefault(key, []).append(row)
+            self._buffered += len(records)
+            self.count += len(records)
+            if self._buffered >= self.batch_rows:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        for key, rows in self._buffers.items():
+            directory = _partition_dir(self.staging_dir, key)
+            os.makedirs(directory, exist_ok=True)
+            self._file_seq += 1
+            pq.write_table(pa.Table.from_pylist(rows, schema=SCHEMA),
+                           os.path.join(directory, f"part-{self.run_id}-{self._file_seq:05d}.parquet"))
+        self._buffers.clear()
+        self._buffered = 0
+
+    def close(self):
+        """Publishes the staged files into the dataset. Returns the dataset path, or None if nothing was written."""
+        with self._lock:
+            self._flush_locked()
+            published = 0
+            for directory, _, files in os.walk(self.staging_dir):
+                target = os.path.join(self.dataset_dir, os.path.relpath(directory, self.staging_dir))
+                for name in files:
+                    os.makedirs(target, exist_ok=True)
+                    os.replace(os.path.join(directory, name), os.path.join(target, name))
+                    published += 1
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+            return self.dataset_dir if published else None
+
+    def abort(self):
+        """Writes out buffered rows but leaves them staged; they are not part of the dataset."""
+        with self._lock:
+            self._flush_locked()
+
+
+def _latest_rows(table):
+    """
+    Keeps, for every announcement (链接), only the rows of its most recent
+    write, one per item_index, so a re-crawled announcement is not counted
+    twice and items it no longer yields are dropped. Rows without a 链接, and
+    rows written before item_index was recorded, are kept as they are unless
+    a newer write of their announcement exists.
+    """
+    links = table.column("链接").to_pylist()
+    indexes = table.column("item_index").to_pylist()
+    # 旧文件没有写入时间，视为最早写入
+    written = [value or datetime.datetime.min for value in table.column("updated_at").to_pylist()]
+    newest = {}
+    for link, when in zip(links, written):
+        if link is not None and when > newest.get(link, datetime.datetime.min):
+            newest[link] = when
+    latest = {}
+    keep = []
+    for row, (link, item_index, when) in enumerate(zip(links, indexes, written)):
+        if link is None:
+            keep.append(row)
+        elif when == newest.get(link, when):
+            if item_index is None:
+                keep.append(row)
+            else:
+                # 写入时间相同（极少见）时保留后读到的那一条
+                latest[(link, item_index)] = row
+    keep.extend(latest.values())
+    return table.take(sorted(keep))
+
+
+def compact_dataset(dataset_dir=PARQUET_DATASET_DIR, min_files=2, log_message=print):
+    """
+    Merges the files of every partition that has at least `min_files` files
+    into a single file, so repeated appends do not leave many small files.
+    Records of announcements that were crawled more than once are
+    deduplicated on (链接, item_index), keeping those of the latest write; an
+    announcement's records all share one partition, so this is done per
+    partition. The merged file is written first and the originals removed
+    afterwards. Returns the number of partitions compacted.
+    """
+    compacted = 0
+    for directory, subdirs, files in os.walk(dataset_dir):
+        # 跳过暂存区等以下划线或点开头的目录
+        subdirs[:] = [d for d in subdirs if not d.startswith(("_", "."))]
+        parts = sorted(name for name in files if name.endswith(".parquet"))
+        if len(parts) < min_files:
+            continue
+        paths = [os.path.join(directory, name) for name in parts]
+        table = pa.concat_tables([pq.read_table(path, schema=SCHEMA) for path in paths])
+        total_rows = table.num_rows
+        table = _latest_rows(table)
+        merged_path = os.path.join(directory, f"part-compacted-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet")
+        pq.write_table(table, merged_path + ".tmp")
+        os.replace(merged_path + ".tmp", merged_path)
+        for path in paths:
+            os.remove(path)
+        compacted += 1
+        duplicates = total_rows - table.num_rows
+        log_message(f"    🗜️ {os.path.relpath(directory, dataset_dir)}: 合并 {len(paths)} 个文件，共 {table.num_rows} 行"
+                    + (f"（去除 {duplicates} 行重复抓取的记录）。" if duplicates else "。"))
+    return compacted
+
+
+def read_dataset(dataset_dir=PARQUET_DATASET_DIR, columns=None, filters=None):
+    """
+    Reads the dataset (or the given columns / partitions) into a pyarrow
+    Table. The partition columns 省份 and 发布月份 come back dictionary-encoded.
+    Re-crawled announcements appear once per crawl until `compact_dataset`
+    has been run.
+    """
+    partitioning = ds.HivePartitioning.discover(infer_dictionary=True)
+    return pq.read_table(dataset_dir, columns=columns, filters=filters, partitioning=partitioning)
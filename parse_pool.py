@@ -0,0 +1,149 @@
+# 多进程解析：将 BeautifulSoup/lxml 的 CPU 开销分摊到多个核心
+# parse_pool.py
+
+import importlib
+import threading
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from config import PARSE_TIMEOUT
+
+
+class ParseError(Exception):
+    """Raised when a page could not be parsed in the worker pool (timeout or worker crash)."""
+
+
+def parse_html(province_pinyin, link, html):
+    """
+    Runs the province parser for `link` over `html` and returns plain record
+    dicts. Executed inside worker processes, so it only takes and returns
+    picklable values.
+    """
+    parser_module = importlib.import_module(f"detail_parsers.{province_pinyin}")
+    parser_instance = parser_module.get_parser_for_url(link)
+    if not parser_instance:
+        return []
+    return parser_instance.parse(html) or []
+
+
+def _kill(executor):
+    # 卡死的任务无法被取消，只能直接结束进程池中的工作进程
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _Task:
+    """One parse() call: its arguments and the pool/future it is currently running on."""
+    __slots__ = ("args", "executor", "future")
+
+    def __init__(self, args):
+        self.args = args
+        self.executor = None
+        self.future = None
+
+
+class ParsePool:
+    """
+    A process pool for parse() calls with a per-task timeout and crash isolation.
+
+    `parse()` blocks the calling thread until the page is parsed. At most
+    `processes` tasks are submitted at a time (other callers wait their turn
+    in their own thread), so a submitted task starts at once and `timeout`
+    only covers the time it spends being parsed, not time spent queueing.
+
+    If a task exceeds `timeout` seconds it is reported as failed and the pool
+    is replaced: the other tasks still running on the old pool are first
+    resubmitted to the new one, then the old worker processes are killed, so
+    one pathological page cannot stall the run or fail its siblings.
+
+    If the pool breaks because some worker crashed, the pool is replaced and
+    every task that was running on it is retried once in a pool of its own,
+    one at a time, since it is unknown which of them crashed: healthy pages
+    then parse normally, and only a page whose own retry crashes too is
+    reported as failed.
+    """
+    def __init__(self, processes, timeout=PARSE_TIMEOUT):
+        self.processes = max(1, processes)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.processes)
+        self._tasks = set()
+        self._isolated_lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(max_workers=self.processes)
+
+    def parse(self, province_pinyin, link, html):
+        task = _Task((province_pinyin, link, html))
+        with self._slots:
+            with self._lock:
+                self._tasks.add(task)
+                self._submit(task)
+            try:
+                return self._wait(task)
+            finally:
+                with self._lock:
+                    self._tasks.discard(task)
+
+    def _submit(self, task):
+        # 调用时需持有 self._lock
+        task.executor = self._executor
+        try:
+            task.future = task.executor.submit(parse_html, *task.args)
+        except BrokenProcessPool as e:
+            # 进程池已损坏但还没有被替换：交给 _wait 按崩溃处理
+            task.future = Future()
+            task.future.set_exception(e)
+
+    def _wait(self, task):
+        while True:
+            with self._lock:
+                executor, future = task.executor, task.future
+            try:
+                result = future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                with self._lock:
+                    if task.future is not future:
+                        continue  # 其他任务超时时本任务已被转移到新的进程池，重新计时
+                    self._replace(executor, stuck=task)
+                raise ParseError(f"解析超时（超过 {self.timeout} 秒）")
+            except (BrokenProcessPool, CancelledError):
+                with self._lock:
+                    if task.future is not future:
+                        continue  # 同上，转移不是因为本任务出错
+                    self._replace(executor)
+                return self._retry_alone(task)
+            if task.future is not future:
+                task.future.cancel()  # 转移前旧进程池已经解析完成，新进程池中的副本不再需要
+            return result
+
+    def _retry_alone(self, task):
+        # 单独在一个新进程中重试，崩溃时只会影响本任务；多个待重试的任务依次进行
+        with self._isolated_lock:
+            executor = ProcessPoolExecutor(max_workers=1)
+            try:
+                return executor.submit(parse_html, *task.args).result(timeout=self.timeout)
+            except FutureTimeoutError:
+                raise ParseError(f"解析超时（超过 {self.timeout} 秒）")
+            except BrokenProcessPool:
+                raise ParseError("解析进程崩溃")
+            finally:
+                _kill(executor)
+
+    def _replace(self, broken, stuck=None):
+        """
+        Replaces `broken` with a fresh pool (unless that already happened).
+        When `stuck` timed out, the other tasks running on `broken` are moved to
+        the new pool before its worker processes are killed. Call with the lock held.
+        """
+        if self._executor is not broken:
+            return  # 另一个线程已经完成了重建
+        self._executor = ProcessPoolExecutor(max_workers=self.processes)
+        if stuck is not None:
+            for task in self._tasks:
+                if task is not stuck and task.executor is broken:
+                    self._submit(task)
+        _kill(broken)
+
+    def close(self):
+        with self._lock:
+            self._executor.shutdown(wait=True, cancel_futures=True)
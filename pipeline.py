@@ -0,0 +1,188 @@
+# 列表页 → 链接队列 → 抓取线程 → 解析线程 → 写出 的流水线
+# pipeline.py
+
+import collections
+import queue
+import threading
+
+from config import PARSE_WORKERS, PIPELINE_QUEUE_SIZE, PIPELINE_MAX_AHEAD
+
+_DONE = object()
+
+
+class CrawlPipeline:
+    """
+    A producer/consumer pipeline for the detail stage of a crawl.
+
+        links → link queue → fetch workers → html queue → parse workers → record queue → writer
+
+    Every stage is connected by a bounded queue, so a slow stage applies
+    backpressure upstream instead of letting pages pile up in memory. The
+    writer re-orders items, so records reach `write` in the same order as
+    `links` yielded them, as soon as all earlier links are finished. At most
+    `max_ahead` links are in the pipeline at once, so a link that stalls
+    (a slow fetch plus retries) holds back at most that many finished results.
+
+    An exception raised by `write` (e.g. a full disk or a locked result store)
+    stops the pipeline: no further links are fetched or written, queued work
+    is drained, and `run()` re-raises the first such exception.
+
+    Args:
+        fetch: fetch(index, link) -> html or None.
+        parse: parse(index, link, html) -> list of record dicts. Called with
+            html=None for links that could not be fetched and should return [].
+        write: write(index, link, records), called in link order from the
+            writer stage.
+        fetch_workers / parse_workers: number of threads per stage.
+        queue_size: capacity of each inter-stage queue.
+        max_ahead: how many links may be fetched, parsed or waiting to be
+            written at once.
+        logger: used to report unexpected errors raised by the stage callables.
+    """
+    def __init__(self, fetch, parse, write, fetch_workers=4, parse_workers=PARSE_WORKERS,
+                 queue_size=PIPELINE_QUEUE_SIZE, max_ahead=PIPELINE_MAX_AHEAD, logger=None):
+        self.fetch = fetch
+        self.parse = parse
+        self.write = write
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = max(1, parse_workers)
+        self.logger = logger
+        self._slots = threading.Semaphore(max(1, max_ahead))
+        self._order = collections.deque()  # 已送入流水线、尚未写出的链接序号，按送入顺序
+        self._link_queue = queue.Queue(queue_size)
+        self._html_queue = queue.Queue(queue_size)
+        self._record_queue = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._fetchers_left = self.fetch_workers
+        self._parsers_left = self.parse_workers
+        self._write_error = None
+        self._aborted = threading.Event()
+
+    def run(self, links):
+        """
+        Pushes `(index, link)` pairs from `links` (e.g. a LinkFrontier, which
+        may still be growing) through the pipeline and blocks until every
+        record has been written. Returns the number of links processed.
+        Raises the first exception raised by `write`.
+        """
+        threads = [threading.Thread(target=self._feed, args=(links,), name="pipeline-feed", daemon=True)]
+        threads += [
+            threading.Thread(target=self._fetch_worker, name=f"pipeline-fetch-{n}", daemon=True)
+            for n in range(self.fetch_workers)
+        ]
+        threads += [
+            threading.Thread(target=self._parse_worker, name=f"pipeline-parse-{n}", daemon=True)
+            for n in range(self.parse_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        written = self._write_in_order()
+        for thread in threads:
+            thread.join()
+        if self._write_error is not None:
+            raise self._write_error
+        return written
+
+    def _report(self, stage, index, error):
+        if self.logger:
+            self.logger.error(f"    [#{index}] ❌ {stage}阶段发生错误: {error}")
+
+    def _feed(self, links):
+        try:
+            for index, link in links:
+                # 写出阶段每写出（或丢弃）一项归还一个名额
+                self._slots.acquire()
+                if self._aborted.is_set():
+                    break
+                with self._lock:
+                    self._order.append(index)
+                self._link_queue.put((index, link))
+        finally:
+            for _ in range(self.fetch_workers):
+                self._link_queue.put(_DONE)
+
+    def _fetch_worker(self):
+        try:
+            while True:
+                item = self._link_queue.get()
+                if item is _DONE:
+                    return
+                index, link = item
+                html = None
+                # 中止后不再抓取，但仍把该项交给写出阶段丢弃，以归还它占用的名额
+                if not self._aborted.is_set():
+                    try:
+                        html = self.fetch(index, link)
+                    except Exception as e:
+                        self._report("抓取", index, e)
+                self._html_queue.put((index, link, html))
+        finally:
+            with self._lock:
+                self._fetchers_left -= 1
+                last = self._fetchers_left == 0
+            if last:
+                for _ in range(self.parse_workers):
+                    self._html_queue.put(_DONE)
+
+    def _parse_worker(self):
+        try:
+            while True:
+                item = self._html_queue.get()
+                if item is _DONE:
+                    return
+                index, link, html = item
+                records = []
+                if not self._aborted.is_set():
+                    try:
+                        records = self.parse(index, link, html) or []
+                    except Exception as e:
+                        self._report("解析", index, e)
+                self._record_queue.put((index, link, records))
+        finally:
+            with self._lock:
+                self._parsers_left -= 1
+                last = self._parsers_left == 0
+            if last:
+                self._record_queue.put(_DONE)
+
+    def _write(self, index, link, records):
+        """Writes one item; after the first failed write, later items are dropped. Returns True if written."""
+        if self._write_error is not None:
+            return False
+        try:
+            self.write(index, link, records)
+            return True
+        except Exception as e:
+            self._report("写出", index, e)
+            self._write_error = e
+            # 停止抓取和解析，上游剩余的任务直接排空
+            self._aborted.set()
+            return False
+
+    def _next_ready(self, pending):
+        with self._lock:
+            if self._order and self._order[0] in pending:
+                return self._order.popleft()
+        return None
+
+    def _write_in_order(self):
+        pending = {}
+        written = 0
+        while True:
+            item = self._record_queue.get()
+            if item is _DONE:
+                break
+            index, link, records = item
+            pending[index] = (link, records)
+            next_index = self._next_ready(pending)
+            while next_index is not None:
+                link, records = pending.pop(next_index)
+                written += self._write(next_index, link, records)
+                self._slots.release()
+                next_index = self._next_ready(pending)
+        # 正常情况下 pending 此时为空；若已中止，按序写出（丢弃）剩余项
+        for index in sorted(pending):
+            link, records = pending[index]
+            written += self._write(index, link, records)
+            self._slots.release()
+        return written
@@ -0,0 +1,163 @@
+# Playwright 抓取后端：单个常驻浏览器 + 页面池
+# playwright_fetcher.py
+
+import asyncio
+import threading
+from fnmatch import fnmatch
+
+from playwright.async_api import async_playwright, Error as PlaywrightError
+
+from config import PLAYWRIGHT_PAGE_POOL_SIZE, PLAYWRIGHT_MAX_PAGE_USES, BLOCKED_URL_PATTERNS, BLOCKED_RESOURCE_TYPES
+from logger_config import get_logger
+
+logger = get_logger("playwright_fetcher")
+
+
+class PlaywrightPagePool:
+    """
+    One long-lived headless Chromium shared by many concurrent fetches.
+
+    The browser and its pages live on a private asyncio event loop running in a
+    background thread, so the pool can be used both from worker threads
+    (`fetch`) and from other asyncio code (`fetch_async`). Up to `size` pages
+    are open at once; each page is recycled after `max_uses` navigations or
+    after an error. With `block_resources`, route interception aborts images,
+    fonts, stylesheets and analytics requests for that fetch.
+    """
+    def __init__(self, size=PLAYWRIGHT_PAGE_POOL_SIZE, max_uses=PLAYWRIGHT_MAX_PAGE_USES, headless=True):
+        self.size = size
+        self.max_uses = max_uses
+        self.headless = headless
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="playwright-loop", daemon=True)
+        self._thread.start()
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._pages = None
+        self._uses = {}
+        self._blocking = {}
+        try:
+            asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        except BaseException:
+            # 浏览器未能启动（例如未安装浏览器）：释放已启动的部分和事件循环线程
+            self.close()
+            raise
+
+    async def _start(self):
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._context = await self._browser.new_context()
+        self._pages = asyncio.Queue()
+        for _ in range(self.size):
+            self._pages.put_nowait(None)  # 页面按需创建
+
+    def fetch(self, url, ready_selector, timeout=20, ready_text=None, block_resources=True):
+        """Blocking fetch for use from threads. Returns the HTML or None."""
+        future = asyncio.run_coroutine_threadsafe(
+            self._fetch(url, ready_selector, timeout, ready_text, block_resources), self._loop
+        )
+        return future.result()
+
+    async def fetch_async(self, url, ready_selector, timeout=20, ready_text=None, block_resources=True):
+        """Awaitable fetch for use from any other event loop. Returns the HTML or None."""
+        future = asyncio.run_coroutine_threadsafe(
+            self._fetch(url, ready_selector, timeout, ready_text, block_resources), self._loop
+        )
+        return await asyncio.wrap_future(future)
+
+    async def _route(self, page_key, route):
+        request = route.request
+        if self._blocking.get(page_key) and (
+            request.resource_type in BLOCKED_RESOURCE_TYPES
+            or any(fnmatch(request.url, pattern) for pattern in BLOCKED_URL_PATTERNS)
+        ):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _fetch(self, url, ready_selector, timeout, ready_text, block_resources):
+        page = await self._pages.get()
+        healthy = True
+        try:
+            if page is None or page.is_closed():
+                page = await self._context.new_page()
+                self._uses[id(page)] = 0
+                page_key = id(page)
+                await page.route("**/*", lambda route: self._route(page_key, route))
+            self._blocking[id(page)] = block_resources
+            await page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
+            ready = page.locator(ready_selector)
+            if ready_text:
+                ready = ready.or_(page.get_by_text(ready_text))
+            await ready.first.wait_for(state="attached", timeout=timeout * 1000)
+            return await page.content()
+        except PlaywrightError as e:
+            healthy = False
+            logger.warning(f"处理页面时出错: {url}, 错误: {e}")
+            return None
+        finally:
+            if page is not None:
+                self._uses[id(page)] = self._uses.get(id(page), 0) + 1
+                if not healthy or self._uses[id(page)] >= self.max_uses:
+                    self._uses.pop(id(page), None)
+                    self._blocking.pop(id(page), None)
+                    try:
+                        await page.close()
+                    except PlaywrightError:
+                        pass
+                    page = None
+            self._pages.put_nowait(page)
+
+    def close(self):
+        """Closes the browser and stops the background event loop."""
+        async def _shutdown():
+            if self._context:
+                await self._context.close()
+            if self._browser:
+                await self._browser.close()
+            if self._playwright:
+                await self._playwright.stop()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_shutdown(), self._loop).result(timeout=30)
+        except PlaywrightError as e:
+            logger.warning(f"关闭 Playwright 浏览器时出错: {e}")
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+
+_shared_pool = None
+_launch_error = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_playwright_pool(size=None):
+    """
+    Returns the process-wide Playwright page pool, launching the browser on
+    first use with `size` pages (defaults to PLAYWRIGHT_PAGE_POOL_SIZE).
+    If the launch fails, the error is raised again on every later call
+    without another attempt, until close_playwright_pool() is called.
+    """
+    global _shared_pool, _launch_error
+    with _shared_pool_lock:
+        if _launch_error is not None:
+            raise _launch_error
+        if _shared_pool is None:
+            try:
+                _shared_pool = PlaywrightPagePool(size=size or PLAYWRIGHT_PAGE_POOL_SIZE)
+            except Exception as e:
+                _launch_error = e
+                raise
+        return _shared_pool
+
+
+def close_playwright_pool():
+    """Closes the shared Playwright browser, if one was started, and forgets a failed launch."""
+    global _shared_pool, _launch_error
+    with _shared_pool_lock:
+        pool, _shared_pool = _shared_pool, None
+        _launch_error = None
+    if pool:
+        pool.close()
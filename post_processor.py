@@ -1,13 +1,123 @@
 import pandas as pd
 import os
-import re
 import traceback
 
+# 分隔符按优先级排序：分号 > 全角分号 > 顿号 > 换行符 > 竖线
+PRIORITIZED_DELIMITERS = [';', '；', '、', '\n', '|']
+# 核心列（规格型号、数量、单价）必须拆分出相同数量的条目；非核心列（名称、品牌）可以只有一项
+CORE_COLUMNS = ['规格型号', '数量', '单价']
+NON_CORE_COLUMNS = ['名称', '品牌']
+ATTACHMENT_COLUMNS = ['名称', '规格型号', '数量', '单价']
+ANY_DELIMITER_PATTERN = r'[、；;\n|]'
+
+
+def _split_parts(series, delim):
+    """
+    Splits every string of `series` on `delim` and keeps the stripped,
+    non-empty parts. Returns the exploded parts (indexed by row, in order) and
+    the number of parts per row.
+    """
+    parts = series.str.split(delim, regex=False).explode().str.strip()
+    parts = parts[parts != '']
+    counts = parts.groupby(level=0).size().reindex(series.index, fill_value=0)
+    return parts, counts
+
+
+def split_rows(df, log_message=print):
+    """
+    Splits rows whose item columns hold several items into one row per item
+    and adds a 'split_status' column:
+
+    - 'attachment': 名称/规格型号/数量/单价 mention '详见附件'; the row is kept as is.
+    - 'ok': the first delimiter (in PRIORITIZED_DELIMITERS order) that splits
+      the core columns into the same number (> 1) of items, with 名称 and 品牌
+      giving either one item or that many, was used to split the row.
+    - 'mismatched': the row contains delimiters but could not be split consistently.
+    - 'single_item': the row holds a single item.
+
+    `df` is expected to be read with `.fillna('')`. Works column-wise with
+    pandas string operations; rows keep their original order, and the items
+    of a split row follow each other.
+    """
+    df = df.reset_index(drop=True)
+    text = {
+        col: df[col].astype(str).str.strip() if col in df.columns else pd.Series('', index=df.index)
+        for col in CORE_COLUMNS + NON_CORE_COLUMNS
+    }
+
+    attachment = pd.Series(False, index=df.index)
+    for col in ATTACHMENT_COLUMNS:
+        attachment |= text[col].str.contains('详见附件', regex=False)
+
+    pending = ~attachment
+    split_frames = []
+    for delim in PRIORITIZED_DELIMITERS:
+        if not pending.any():
+            break
+        # 只有三列核心参数都含有该分隔符的行才可能拆分出多于一条
+        candidates = pending[pending].index
+        for col in CORE_COLUMNS:
+            candidates = candidates[text[col][candidates].str.contains(delim, regex=False).to_numpy(dtype=bool)]
+        if candidates.empty:
+            continue
+        core = {col: _split_parts(text[col][candidates], delim) for col in CORE_COLUMNS}
+        num_items = core['规格型号'][1]
+        aligned = (num_items > 1) & (core['数量'][1] == num_items) & (core['单价'][1] == num_items)
+        if not aligned.any():
+            continue
+
+        rows = aligned[aligned].index
+        num_items = num_items[rows]
+        non_core = {col: _split_parts(text[col][rows], delim) for col in NON_CORE_COLUMNS}
+        valid = pd.Series(True, index=rows)
+        for parts, counts in non_core.values():
+            valid &= (counts == 1) | (counts == num_items)
+        rows = valid[valid].index
+        if rows.empty:
+            continue
+        num_items = num_items[rows]
+
+        exploded = df.loc[rows.repeat(num_items)].copy()
+        for col in CORE_COLUMNS:
+            parts = core[col][0]
+            exploded[col] = parts[parts.index.isin(rows)].to_numpy()
+        for col, (parts, counts) in non_core.items():
+            # 只有一项的非核心列在每个拆分出的条目中重复使用
+            counts = counts[rows]
+            per_item = parts[parts.index.isin(counts[counts == num_items].index)]
+            single = parts[parts.index.isin(counts[counts == 1].index)]
+            single = single.loc[single.index.repeat(num_items[single.index])]
+            exploded[col] = pd.concat([per_item, single]).sort_index(kind='stable').to_numpy()
+        exploded['split_status'] = 'ok'
+        split_frames.append(exploded)
+        log_message(f"    - ✅ {len(rows)} 行使用分隔符 {delim!r} 成功匹配，拆分为 {int(num_items.sum())} 条。")
+        pending &= ~df.index.isin(rows)
+
+    has_delimiter = pd.Series(False, index=df.index)
+    for col in CORE_COLUMNS + NON_CORE_COLUMNS:
+        has_delimiter |= text[col].str.contains(ANY_DELIMITER_PATTERN, regex=True)
+    mismatched = pending & has_delimiter
+
+    unsplit = df[~df.index.isin(pd.concat(split_frames).index)].copy() if split_frames else df.copy()
+    unsplit['split_status'] = 'single_item'
+    unsplit.loc[attachment[unsplit.index], 'split_status'] = 'attachment'
+    unsplit.loc[mismatched[unsplit.index], 'split_status'] = 'mismatched'
+
+    if attachment.any():
+        log_message(f"    - ℹ️  {int(attachment.sum())} 行包含 '详见附件'，跳过拆分。")
+    if mismatched.any():
+        row_numbers = ', '.join(str(i + 2) for i in mismatched[mismatched].index[:20])
+        more = ' 等' if mismatched.sum() > 20 else ''
+        log_message(f"    - ⚠️ {int(mismatched.sum())} 行未使用任何优先分隔符成功匹配，跳过拆分（第 {row_numbers}{more} 行）。")
+
+    return pd.concat([unsplit] + split_frames).sort_index(kind='stable').reset_index(drop=True)
+
+
 def process_file(input_path, logger=None):
     """
     Processes a raw CSV file using a prioritized delimiter approach.
-    It iterates through a list of delimiters. For each row, it uses the first
-    delimiter that successfully splits the 'core columns' into an equal number of items.
+    For each row, the first delimiter that successfully splits the 'core columns'
+    into an equal number of items is used; see split_rows.
     """
     def log_message(msg):
         if logger and hasattr(logger, 'put'):
@@ -23,89 +133,20 @@ def process_file(input_path, logger=None):
         directory, filename = os.path.split(input_path)
         name, ext = os.path.splitext(filename)
         output_path = os.path.join(directory, f"{name}_processed.csv")
-        
+
         log_message(f"▶️ 开始使用[分隔符优先级]原则处理文件: {filename}")
 
         df = pd.read_csv(input_path).fillna('')
-        new_rows = []
-        # 分隔符按优先级排序：分号 > 顿号 > 换行符 > 竖线
-        prioritized_delimiters = [';', '；', '、', '\n', '|']
-
-        for index, row in df.iterrows():
-            row_dict = row.to_dict()
-            
-            # --- Get string representations of all relevant columns ---
-            name_str = str(row_dict.get('名称', '')).strip()
-            brand_str = str(row_dict.get('品牌', '')).strip()
-            spec_str = str(row_dict.get('规格型号', '')).strip()
-            count_str = str(row_dict.get('数量', '')).strip()
-            price_str = str(row_dict.get('单价', '')).strip()
-
-            if any('详见附件' in s for s in [name_str, spec_str, count_str, price_str]):
-                log_message(f"    - ℹ️  第 {index + 2} 行包含 '详见附件'，跳过拆分。")
-                row_dict['split_status'] = 'attachment'
-                new_rows.append(row_dict)
-                continue
-
-            split_successful = False
-            for delim in prioritized_delimiters:
-                # --- Attempt to split core columns with the current delimiter ---
-                # The regex needs to be just the delimiter itself, not a character class
-                specs = [s.strip() for s in re.split(re.escape(delim), spec_str) if s.strip()]
-                counts = [s.strip() for s in re.split(re.escape(delim), count_str) if s.strip()]
-                prices = [s.strip() for s in re.split(re.escape(delim), price_str) if s.strip()]
-
-                core_lengths = [len(specs), len(counts), len(prices)]
-                
-                # --- Check for core alignment ---
-                is_core_aligned = len(set(core_lengths)) == 1
-                num_items = core_lengths[0] if is_core_aligned else 0
-
-                if is_core_aligned and num_items > 1:
-                    # --- If core is aligned, check non-core columns ---
-                    names = [s.strip() for s in re.split(re.escape(delim), name_str) if s.strip()]
-                    brands = [s.strip() for s in re.split(re.escape(delim), brand_str) if s.strip()]
-                    non_core_lengths = [len(names), len(brands)]
-                    
-                    are_non_core_valid = all(l == 1 or l == num_items for l in non_core_lengths)
-
-                    if are_non_core_valid:
-                        # --- SUCCESS: Split the row and break from the delimiter loop ---
-                        log_message(f"    - ✅ 第 {index + 2} 行使用分隔符 '{delim}' 成功匹配，拆分为 {num_items} 条。")
-                        for i in range(num_items):
-                            new_item = row_dict.copy()
-                            new_item['名称'] = names[i if len(names) == num_items else 0]
-                            new_item['品牌'] = brands[i if len(brands) == num_items else 0]
-                            new_item['规格型号'] = specs[i]
-                            new_item['数量'] = counts[i]
-                            new_item['单价'] = prices[i]
-                            new_item['split_status'] = 'ok'
-                            new_rows.append(new_item)
-                        
-                        split_successful = True
-                        break # Exit the delimiter loop for this row
-
-            if not split_successful:
-                # --- Did not split: Append original row ---
-                all_lengths = [len(re.split(r'[、；;\n|]', s)) for s in [name_str, brand_str, spec_str, count_str, price_str]]
-                is_single = all(l <= 1 for l in all_lengths)
-                
-                if not is_single:
-                    log_message(f"    - ⚠️ 第 {index + 2} 行未使用任何优先分隔符成功匹配，跳过拆分。")
-                    row_dict['split_status'] = 'mismatched'
-                else:
-                    row_dict['split_status'] = 'single_item'
-                new_rows.append(row_dict)
-
-        if not new_rows:
+        processed_df = split_rows(df, log_message)
+
+        if processed_df.empty:
             log_message("🤷‍♂️ 文件处理后没有数据。")
             return None
 
-        processed_df = pd.DataFrame(new_rows)
         processed_df.to_csv(output_path, index=False, encoding='utf-8-sig')
         log_message(f"✅ 预处理完成，文件已保存到: {os.path.basename(output_path)}")
         return output_path
-    
+
     except Exception as e:
         log_message(f"❌ 在 process_file 中发生严重错误: {e}")
         log_message(traceback.format_exc())
@@ -115,11 +156,11 @@ if __name__ == '__main__':
     class ConsoleLogger:
         def put(self, message):
             print(message)
-    
+
     logger = ConsoleLogger()
     test_file_path = r'output\中标公告_空调_江苏_2025-06-11_to_2025-06-12.csv'
-    
+
     if os.path.exists(test_file_path):
         process_file(test_file_path, logger)
     else:
-        logger.put(f"测试文件不存在: {test_file_path}") 
\ No newline at end of file
+        logger.put(f"测试文件不存在: {test_file_path}")
\ No newline at end of file
@@ -0,0 +1,186 @@
+# 查询规划：按命中数自适应二分日期窗口，并行抓取各子窗口的列表页
+# query_planner.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from config import SEARCH_RESULT_THRESHOLD, PLANNER_WORKERS, RESULTS_PER_PAGE
+from search_parser import fetch_list_page, parse_result_count, parse_page_count, collect_list_links, ListPageError
+
+
+def split_window(start_date, end_date):
+    """
+    Splits an inclusive `YYYY-MM-DD` date window into two halves. Returns None
+    if the window is a single day and cannot be split further.
+    """
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    days = (end - start).days
+    if days < 1:
+        return None
+    middle = start + timedelta(days=(days - 1) // 2)
+    return (
+        (start.isoformat(), middle.isoformat()),
+        ((middle + timedelta(days=1)).isoformat(), end.isoformat()),
+    )
+
+
+class _WindowLinks:
+    """The frontier handed to collect_list_links for one leaf window; see _OrderedWindows."""
+    def __init__(self, windows, position):
+        self._windows = windows
+        self._position = position
+        self._count = 0
+
+    def extend(self, links):
+        links = list(links)
+        self._count += len(links)
+        return self._windows.extend(self._position, links)
+
+    def __len__(self):
+        return self._count
+
+
+class _OrderedWindows:
+    """
+    Merges the links of leaf windows crawled in parallel into the frontier in
+    date order, so the output order does not depend on thread timing.
+
+    The earliest unfinished window adds its links to the frontier directly,
+    so the detail stage starts without waiting for the whole list phase;
+    later windows buffer theirs until every earlier window has finished,
+    whether it succeeded or failed. `on_window_done(window)` is called as each
+    successfully crawled window's links reach the frontier, so a checkpoint
+    never marks a window done before its links are saved.
+    """
+    def __init__(self, frontier, windows, on_window_done=None):
+        self.frontier = frontier
+        self.windows = list(windows)
+        self.on_window_done = on_window_done
+        self._lock = threading.Lock()
+        self._buffers = [[] for _ in self.windows]
+        self._finished = [False] * len(self.windows)
+        self._done = [False] * len(self.windows)
+        self._head = 0
+
+    def links_for(self, position):
+        return _WindowLinks(self, position)
+
+    def extend(self, position, links):
+        with self._lock:
+            if position == self._head:
+                return self.frontier.extend(links)
+            self._buffers[position].extend(links)
+            return len(links)
+
+    def finish(self, position, done=True):
+        """
+        Marks a window as finished, completely crawled unless `done` is false
+        (it failed part-way), and releases every window that is now in order.
+        """
+        with self._lock:
+            self._finished[position] = True
+            self._done[position] = done
+            while self._head < len(self.windows) and self._finished[self._head]:
+                if self.on_window_done and self._done[self._head]:
+                    self.on_window_done(self.windows[self._head])
+                self._head += 1
+                if self._head < len(self.windows):
+                    self.frontier.extend(self._buffers[self._head])
+                    self._buffers[self._head] = []
+
+
+class QueryPlanner:
+    """
+    Plans the list-page crawl of one province/keyword search.
+
+    The search site only paginates a limited number of hits per query, so a
+    wide date window is silently truncated. The planner fetches page 1 of a
+    window, reads its hit count, and bisects windows with more than
+    `threshold` hits until they fit (or are a single day). Planning runs level
+    by level with the windows of a level probed in parallel; the resulting
+    leaf windows are then crawled in parallel with `collect_list_links`, and
+    their links are added to the LinkFrontier in date order (which merges
+    duplicates across windows), so the link order is deterministic.
+    """
+    def __init__(self, province_cn, keyword, frontier, logger, threshold=SEARCH_RESULT_THRESHOLD, workers=PLANNER_WORKERS):
+        self.province_cn = province_cn
+        self.keyword = keyword
+        self.frontier = frontier
+        self.logger = logger
+        self.threshold = threshold
+        self.workers = max(1, workers)
+
+    def _probe(self, window):
+        start_date, end_date = window
+        return fetch_list_page(self.province_cn, self.keyword, start_date, end_date, 1)
+
+    def _hit_count(self, html):
+        hits = parse_result_count(html)
+        if hits is None:
+            pages = parse_page_count(html)
+            hits = pages * RESULTS_PER_PAGE if pages is not None else None
+        return hits
+
+    def plan(self, start_date, end_date, executor):
+        """Returns the leaf windows as `[((start, end), (url, html)), ...]` in date order."""
+        level = [(start_date, end_date)]
+        leaves = {}
+        while level:
+            next_level = []
+            for window, first_page in zip(level, executor.map(self._probe, level)):
+                url, html = first_page
+                hits = self._hit_count(html) if html else None
+                if hits is not None and hits > self.threshold:
+                    halves = split_window(*window)
+                    if halves:
+                        self.logger.info(f"🪓 {window[0]} ~ {window[1]} 共 {hits} 条结果，超过阈值 {self.threshold}，拆分为两个窗口。")
+                        next_level.extend(halves)
+                        continue
+                    self.logger.warning(f"⚠️ {window[0]} 单日共 {hits} 条结果，超过阈值 {self.threshold}，结果可能被搜索站点截断。")
+                leaves[window] = first_page
+            level = next_level
+        return sorted(leaves.items())
+
+    def run(self, start_date, end_date, skip=(), on_window_done=None):
+        """
+        Crawls every list page in the window, bisecting as needed. Leaf windows
+        in `skip` (e.g. completed before a resume) are not crawled again, and
+        `on_window_done(window)` is called after each leaf window is complete.
+        A window whose list pages still fail after retries is not reported as
+        done; the other windows are still crawled, then the first such
+        ListPageError is raised. Any other exception in a window is re-raised
+        once the other windows have finished; their links still reach the
+        frontier. Returns the number of leaf windows.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="planner") as executor:
+            leaves = self.plan(start_date, end_date, executor)
+            if len(leaves) > 1:
+                self.logger.info(f"🗓️ 日期范围已拆分为 {len(leaves)} 个子窗口，并行抓取列表页。")
+            pending = [leaf for leaf in leaves if leaf[0] not in skip]
+            if len(pending) < len(leaves):
+                self.logger.info(f"⏭️ 跳过 {len(leaves) - len(pending)} 个已完成的子窗口。")
+
+            ordered = _OrderedWindows(self.frontier, [window for window, _ in pending], on_window_done)
+
+            def collect(position):
+                window, first_page = pending[position]
+                done = False
+                try:
+                    collect_list_links(self.province_cn, self.keyword, window[0], window[1],
+                                       ordered.links_for(position), self.logger, first_page=first_page)
+                    done = True
+                except ListPageError as e:
+                    self.logger.error(f"❌ {e}，该窗口未完成，续爬时将重新抓取。")
+                    return e
+                finally:
+                    # 无论成功与否都要结束该窗口，否则其后各窗口的链接会一直缓存而进不了队列
+                    ordered.finish(position, done)
+                return None
+
+            # 逐个提交而不用 executor.map：map 在遇到异常时会取消尚未开始的窗口
+            futures = [executor.submit(collect, position) for position in range(len(pending))]
+            errors = [error for error in (future.result() for future in futures) if error]
+        if errors:
+            raise errors[0]
+        return len(leaves)
@@ -0,0 +1,140 @@
+# 按域名限速与自适应并发控制
+# rate_limiter.py
+
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from config import HOST_RATE_LIMITS, DEFAULT_HOST_RATE_LIMIT, ADAPTIVE_CONCURRENCY
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket: `rate` tokens per second refill a bucket that
+    holds at most `burst` tokens. `acquire()` blocks until a token is available.
+    """
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AimdController:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit.
+
+    Each completed request with latency under `target_latency` raises the limit
+    by `increase / limit` (about +1 per window of `limit` requests). A failed
+    request (timeout, 403, 429, 5xx) multiplies it by `decrease`, at most once
+    per `cooldown` seconds so a burst of failures from one overload only backs
+    off once. Slow but successful requests hold the limit where it is.
+    """
+    def __init__(self, initial, minimum, maximum, target_latency, increase=1.0, decrease=0.5, cooldown=2.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self):
+        with self._cond:
+            return int(self._limit)
+
+    def acquire(self):
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency, failed=False):
+        with self._cond:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if failed:
+                if now - self._last_decrease >= self.cooldown:
+                    self._limit = max(self.minimum, self._limit * self.decrease)
+                    self._last_decrease = now
+            elif latency <= self.target_latency:
+                self._limit = min(self.maximum, self._limit + self.increase / self._limit)
+            self._cond.notify_all()
+
+
+class RequestTicket:
+    """Handed to the caller of `HostThrottle.request`; set `failed` to report an overload signal."""
+    def __init__(self):
+        self.failed = False
+
+    def record_status(self, status_code):
+        if status_code in (403, 429) or status_code >= 500:
+            self.failed = True
+
+
+class HostThrottle:
+    """
+    Per-host request gate combining a token bucket (requests per second) with
+    an AIMD concurrency controller (requests in flight). Every fetch path goes
+    through `request(url)` so list pages, detail pages and the Jiangsu mirror
+    are each held to their own safe rate.
+    """
+    def __init__(self, rate_limits=HOST_RATE_LIMITS, default_rate_limit=DEFAULT_HOST_RATE_LIMIT, concurrency=ADAPTIVE_CONCURRENCY):
+        self._rate_limits = rate_limits
+        self._default_rate_limit = default_rate_limit
+        self._concurrency = concurrency
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _get(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                rate, burst = self._rate_limits.get(host, self._default_rate_limit)
+                self._hosts[host] = (TokenBucket(rate, burst), AimdController(**self._concurrency))
+            return self._hosts[host]
+
+    @contextmanager
+    def request(self, url):
+        bucket, controller = self._get(urlsplit(url).hostname or "")
+        controller.acquire()
+        ticket = RequestTicket()
+        started = None
+        try:
+            bucket.acquire()
+            started = time.monotonic()
+            yield ticket
+        except Exception:
+            ticket.failed = True
+            raise
+        finally:
+            latency = time.monotonic() - started if started is not None else 0.0
+            controller.release(latency, failed=ticket.failed)
+
+    def snapshot(self):
+        """Returns the current concurrency limit for every host seen so far."""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: controller.limit for host, (_, controller) in hosts.items()}
+
+
+throttle = HostThrottle()
@@ -0,0 +1,189 @@
+# 重新解析：用当前的解析器在多个进程中离线解析页面存档，输出新的结果文件和记录变化摘要
+# reparse.py
+
+import argparse
+import csv
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from config import PAGE_ARCHIVE_DIR, REPARSE_PROCESSES, OUTPUT_FORMAT, RESULT_STORE_PATH
+from logger_config import get_logger
+from page_archive import PageArchive, records_hash
+from parse_pool import ParsePool
+from province_mapping import PROVINCE_PINYIN_MAP, PINYIN_PROVINCE_MAP
+from seen_index import parser_fingerprint, PARSER_FINGERPRINT_FIELD
+from sinks import open_sink, SINK_FORMATS
+
+logger = get_logger("reparse")
+
+DIFF_COLUMNS = ["链接", "省份", "变化", "原记录数", "新记录数", "变化字段"]
+# 每解析多少个页面把新结果写回存档一次
+_SAVE_EVERY = 500
+
+
+def changed_fields(old_records, new_records):
+    """Names the fields whose values differ between two record lists, compared item by item."""
+    fields = set()
+    for i in range(max(len(old_records), len(new_records))):
+        old = old_records[i] if i < len(old_records) else {}
+        new = new_records[i] if i < len(new_records) else {}
+        fields.update(k for k in set(old) | set(new) if old.get(k) != new.get(k))
+    fields.discard(PARSER_FINGERPRINT_FIELD)
+    return sorted(fields)
+
+
+def reparse_archive(provinces=None, output_dir="output", output_format=OUTPUT_FORMAT, processes=REPARSE_PROCESSES,
+                    store_path=None, archive_dir=PAGE_ARCHIVE_DIR, everything=False):
+    """
+    Re-runs the current province parsers over the archived pages (or only
+    those of `provinces`, in pinyin) on a process pool, without any network
+    access. Only pages whose records were produced by a different version of
+    their province parser (see seen_index.parser_fingerprint), or never
+    parsed, are re-parsed unless `everything` is true; the other pages' stored
+    records go to the output unchanged.
+
+    Writes all records to a fresh `重新解析_<时间>` output file (and upserts
+    them into the result store if `store_path` is given), compares each
+    page's records with those it gave last time and writes the pages whose
+    records changed to `<输出文件>_变化.csv`. The archive then remembers the
+    new records, so the next re-parse diffs against this one. Returns
+    (output path, diff path, Counter of 新增/变更/未变/解析失败/跳过 pages).
+    """
+    processes = processes or os.cpu_count() or 1
+    archive = PageArchive(archive_dir)
+    pages = archive.pages(provinces)
+    stats = Counter()
+    if not pages:
+        logger.info("🤷‍♀️ 页面存档中没有可解析的页面。")
+        archive.close()
+        return None, None, stats
+    fingerprints = {province: parser_fingerprint(province) for province in {page["province"] for page in pages}}
+    if not everything:
+        for page in pages:
+            page["skip"] = (page["records"] is not None
+                            and page["parser_fingerprint"] == fingerprints[page["province"]])
+        stats["跳过"] = sum(page["skip"] for page in pages)
+        if stats["跳过"] == len(pages):
+            logger.info(f"✅ {len(pages)} 个存档页面的解析器均未修改，无需重新解析。")
+            archive.close()
+            return None, None, stats
+
+    os.makedirs(output_dir, exist_ok=True)
+    base_path = os.path.join(output_dir, f"重新解析_{time.strftime('%Y%m%d_%H%M%S')}")
+    diff_path = f"{base_path}_变化.csv"
+    logger.info(f"🔁 使用 {processes} 个进程重新解析 {len(pages) - stats['跳过']} 个存档页面"
+                f"（{stats['跳过']} 个页面的解析器未修改，沿用已有记录）...")
+
+    sinks = [open_sink(base_path, output_format)]
+    if store_path:
+        from result_store import ResultStore
+        sinks.append(ResultStore(store_path, run_id=os.path.basename(base_path)))
+    pool = ParsePool(processes)
+
+    def parse(page):
+        if page.get("skip"):
+            return page["records"], None
+        html = archive.read(page["content_hash"])
+        if html is None:
+            return None, "页面存档文件缺失"
+        try:
+            records = pool.parse(page["province"], page["url"], html)
+        except Exception as e:
+            return None, str(e)
+        for record in records:
+            record["链接"] = page["url"]
+            record["省份"] = PINYIN_PROVINCE_MAP.get(page["province"], page["province"])
+            record[PARSER_FINGERPRINT_FIELD] = fingerprints[page["province"]]
+        return records, None
+
+    started = time.time()
+    parsed = []
+    changed_provinces = Counter()
+    try:
+        with open(diff_path, "w", newline="", encoding="utf-8-sig") as diff_file, \
+                ThreadPoolExecutor(max_workers=processes * 2) as threads:
+            diff = csv.writer(diff_file)
+            diff.writerow(DIFF_COLUMNS)
+            # 按存档顺序取回结果，输出文件的顺序与存档一致
+            for page, (records, error) in zip(pages, threads.map(parse, pages)):
+                province_cn = PINYIN_PROVINCE_MAP.get(page["province"], page["province"])
+                old = page["records"]
+                if error:
+                    stats["解析失败"] += 1
+                    logger.warning(f"    ❌ {page['url']} 解析失败: {error}")
+                    continue
+                for sink in sinks:
+                    sink.write(records)
+                if page.get("skip"):
+                    continue
+                parsed.append((page["url"], records, fingerprints[page["province"]]))
+                if old is None:
+                    change, fields = "新增", []
+                elif page["records_hash"] == records_hash(records):
+                    change, fields = "未变", []
+                else:
+                    change, fields = "变更", changed_fields(old, records)
+                stats[change] += 1
+                if change != "未变":
+                    changed_provinces[province_cn] += 1
+                    diff.writerow([page["url"], province_cn, change, len(old) if old is not None else "",
+                                   len(records), "、".join(fields)])
+                if len(parsed) >= _SAVE_EVERY:
+                    archive.record_results(parsed)
+                    parsed = []
+        archive.record_results(parsed)
+    except BaseException:
+        for sink in sinks:
+            sink.abort()
+        raise
+    finally:
+        pool.close()
+        archive.close()
+
+    output_path = None
+    for sink in sinks:
+        path = sink.close()
+        output_path = output_path or path
+    if not stats["新增"] + stats["变更"]:
+        os.remove(diff_path)
+        diff_path = None
+
+    logger.info(f"✅ 重新解析完成，用时 {time.time() - started:.1f} 秒：" +
+                "，".join(f"{name} {stats[name]} 个" for name in ("变更", "新增", "未变", "解析失败", "跳过")))
+    for province_cn, count in changed_provinces.most_common():
+        logger.info(f"    - {province_cn}: {count} 个公告的记录有变化")
+    if output_path:
+        logger.info(f"🎉 {sinks[0].count} 条记录已保存到 {output_path}")
+    if diff_path:
+        logger.info(f"📝 变化摘要已保存到 {diff_path}")
+    return output_path, diff_path, stats
+
+
+def main(argv=None):
+    """重新解析页面存档: python main.py reparse [--province 浙江 ...] [--processes N]"""
+    parser = argparse.ArgumentParser(prog="main.py reparse", description="用当前的解析器离线重新解析已存档的详情页")
+    parser.add_argument("--province", nargs="+", help="只重新解析这些省份（中文）")
+    parser.add_argument("--processes", type=int, default=REPARSE_PROCESSES, help="解析进程数 (默认使用全部 CPU 核心)")
+    parser.add_argument("--output", default="output", help="输出目录")
+    parser.add_argument("--format", dest="output_format", choices=SINK_FORMATS, default=OUTPUT_FORMAT, help=f"结果文件格式 (默认 {OUTPUT_FORMAT})")
+    parser.add_argument("--store", nargs="?", const=RESULT_STORE_PATH, metavar="DB", help="同时更新 SQLite 结果库")
+    parser.add_argument("--all", dest="everything", action="store_true", help="重新解析所有页面，包括解析器未修改的页面")
+    parser.add_argument("--archive", default=PAGE_ARCHIVE_DIR, help=f"页面存档目录 (默认 {PAGE_ARCHIVE_DIR})")
+    args = parser.parse_args(argv)
+
+    provinces = None
+    if args.province:
+        unknown = [p for p in args.province if p not in PROVINCE_PINYIN_MAP]
+        if unknown:
+            parser.error(f"未知的省份: {'、'.join(unknown)}")
+        provinces = [PROVINCE_PINYIN_MAP[p] for p in args.province]
+    if not os.path.isdir(args.archive):
+        parser.error(f"页面存档不存在: {args.archive}（抓取时会自动建立）")
+    reparse_archive(provinces, args.output, args.output_format, args.processes, args.store, args.archive,
+                    args.everything)
+
+
+if __name__ == "__main__":
+    main()
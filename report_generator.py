@@ -1,8 +1,10 @@
+import io
+import numpy as np
 import pandas as pd
 import os
 import re
 import traceback
-from post_processor import process_file
+from post_processor import split_rows
 
 def parse_spec_and_model(name_str, model_str):
     """
@@ -28,14 +30,14 @@ def parse_spec_and_model(name_str, model_str):
         return spec, model_part
 
     # Case 3: Split descriptive text from alphanumeric model code
-    match = re.match(r'([\u4e00-\u9fa5\s\d\.P匹Ww瓦挂柜匹]+)([A-Z_a-z0-9-].*)', model_str)
+    match = re.match(r'([一-龥\s\d\.P匹Ww瓦挂柜匹]+)([A-Z_a-z0-9-].*)', model_str)
     if match:
         spec = match.group(1).strip()
         model = match.group(2).strip()
         return spec, model
         
     # Case 4: If model_str itself looks like a model code, use name_str as spec
-    if re.search(r'[A-Za-z]', model_str) and re.search(r'\d', model_str) and len(re.findall(r'[\u4e00-\u9fa5]', model_str)) < 3:
+    if re.search(r'[A-Za-z]', model_str) and re.search(r'\d', model_str) and len(re.findall(r'[一-龥]', model_str)) < 3:
         return name_str, model_str
 
     # Fallback
@@ -56,10 +58,212 @@ def clean_numeric_value(value_str):
     except (ValueError, TypeError):
         return 'N/A'
 
-def create_formatted_report(input_csv_path, logger=None):
+FINAL_COLUMNS = ['项目名称', '中标单位', '品牌', '规格', '型号', '数量(台)', '中标单价(元)', '中标公示日期', '备注', '网址']
+STATUS_REMARKS = {'mismatched': '核心参数数量不匹配', 'attachment': '参数见附件'}
+
+
+def _column(df, name, default):
+    """Equivalent of row.get(name, default) for every row."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+
+def _text(values):
+    """
+    str() of every value as a Python-object Series. pandas>=3 stores strings in
+    pyarrow by default, whose regex engine treats \\d and \\s as ASCII-only;
+    object-dtype string methods use Python's re, like the row-wise functions.
+    """
+    return values.astype(str).astype(object)
+
+
+def _parse_spec_and_model_columns(names, models):
+    """
+    Column-wise version of parse_spec_and_model: takes the stripped 名称 and
+    规格型号 strings and returns the (规格, 型号) Series, trying the same
+    cases in the same order.
+    """
+    spec = pd.Series(index=models.index, dtype=object)
+    model = pd.Series(index=models.index, dtype=object)
+    pending = pd.Series(True, index=models.index)
+
+    # Case 1: 型号写在末尾的括号中
+    extracted = models.str.extract(r'(.+?)\s*[（(](.+?)[)）]$')
+    hit = extracted[0].notna()
+    spec[hit] = extracted.loc[hit, 0].str.strip()
+    model[hit] = extracted.loc[hit, 1].str.strip()
+    pending &= ~hit
+
+    # Case 2: "规格：... 型号：..."
+    hit = pending & models.str.contains('型号：', regex=False)
+    parts = models[hit].str.split('型号：', regex=False)
+    spec_part = parts.str[0].str.replace('规格：', '', regex=False).str.strip()
+    spec[hit] = spec_part.where(spec_part != '', names[hit])
+    model[hit] = parts.str[1].str.strip()
+    pending &= ~hit
+
+    # Case 3: 中文描述在前，字母数字型号在后
+    extracted = models[pending].str.extract(r'^([一-龥\s\d\.P匹Ww瓦挂柜匹]+)([A-Z_a-z0-9-].*)')
+    hit = extracted[0].notna().reindex(models.index, fill_value=False)
+    spec[hit] = extracted.loc[hit[hit].index, 0].str.strip()
+    model[hit] = extracted.loc[hit[hit].index, 1].str.strip()
+    pending &= ~hit
+
+    # Case 4: 规格型号本身像型号编码，规格取名称
+    rest = models[pending]
+    hit = (rest.str.contains(r'[A-Za-z]', regex=True)
+           & rest.str.contains(r'\d', regex=True)
+           & (rest.str.count(r'[一-龥]') < 3)).reindex(models.index, fill_value=False)
+    spec[hit] = names[hit]
+    model[hit] = models[hit]
+    pending &= ~hit
+
+    # Fallback
+    has_model = pending & ~models.isin(['N/A', ''])
+    spec[has_model] = models[has_model]
+    spec[pending & ~has_model] = names[pending & ~has_model]
+    model[pending] = 'N/A'
+    return spec, model
+
+
+def _clean_numeric_column(values):
+    """
+    Column-wise version of clean_numeric_value(str(value)). The strip is
+    vectorized; each distinct remaining string is converted once with float(),
+    so the values (and hence the written report) are identical to the
+    row-wise function.
+    """
+    text = _text(values)
+    blank = text.str.strip().isin(['N/A', ''])
+    cleaned = text.str.replace(r'[^\d.]', '', regex=True)
+
+    def to_number(number_str):
+        try:
+            val = float(number_str)
+            return int(val) if val == int(val) else val
+        except (ValueError, TypeError, OverflowError):
+            return 'N/A'
+
+    codes, uniques = pd.factorize(cleaned)
+    numbers = np.array([to_number(number_str) for number_str in uniques] + ['N/A'], dtype=object)
+    return pd.Series(numbers[np.where(blank, -1, codes)], index=values.index, dtype=object)
+
+
+def format_rows(df):
+    """
+    Builds the final report columns from a split DataFrame (as produced by
+    post_processor.split_rows and read with `.fillna('')`). Column-wise
+    equivalent of formatting every row with parse_spec_and_model and
+    clean_numeric_value.
+    """
+    status = _column(df, 'split_status', None)
+    is_ok = (status == 'ok').to_numpy(dtype=bool)
+
+    remark = status.map(STATUS_REMARKS).fillna('').astype(object)
+    mentions_attachment = pd.Series(False, index=df.index)
+    for col in ['名称', '规格型号', '数量', '单价']:
+        mentions_attachment |= _column(df, col, '').astype(str).str.contains('详见附件', regex=False)
+    remark[(remark == '') & mentions_attachment] = '参数见附件'
+
+    names = _text(_column(df, '名称', None)).str.strip()
+    models = _text(_column(df, '规格型号', None)).str.strip()
+    spec, model = _parse_spec_and_model_columns(names, models)
+
+    # 只有成功拆分的行才清洗数值，否则保留原文，避免数据错位
+    quantity = _column(df, '数量', '').astype(object)
+    unit_price = _column(df, '单价', '').astype(object)
+    if is_ok.any():
+        quantity[is_ok] = _clean_numeric_column(quantity[is_ok])
+        unit_price[is_ok] = _clean_numeric_column(unit_price[is_ok])
+
+    columns = {
+        '项目名称': _column(df, '项目名称', 'N/A'),
+        '中标单位': _column(df, '供应商名称', 'N/A'),
+        '品牌': _column(df, '品牌', 'N/A'),
+        '规格': spec,
+        '型号': model,
+        '数量(台)': quantity,
+        '中标单价(元)': unit_price,
+        '中标公示日期': _column(df, '发布日期', 'N/A'),
+        '备注': remark,
+        '网址': _column(df, '链接', 'N/A'),
+    }
+    # 逐列按对象类型重新推断 dtype，与按行构造 DataFrame 时的推断结果一致
+    formatted = pd.DataFrame({name: col.astype(object).to_numpy() for name, col in columns.items()}, columns=FINAL_COLUMNS)
+    return formatted.infer_objects()
+
+
+def write_report_csv(df, path):
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+    return path
+
+
+def write_report_xlsx(df, path):
+    df.to_excel(path, index=False, engine='openpyxl')
+    return path
+
+
+# 报告输出：按文件扩展名选择写出方式
+REPORT_WRITERS = {'.csv': write_report_csv, '.xlsx': write_report_xlsx}
+
+
+def _read_back(df):
+    """
+    Gives the split DataFrame the column types it had when it was read back
+    from `_processed.csv`: read_csv infers each column's type from all its
+    values, so e.g. a column whose split parts are all numbers becomes float.
+    Done on an in-memory CSV, as only read_csv itself infers types exactly
+    the same way.
+    """
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    buffer.seek(0)
+    return pd.read_csv(buffer).fillna('')
+
+
+def build_report(raw_df, log_message=print, processed_path=None):
+    """
+    In-memory report pipeline: raw crawl DataFrame → split_rows → format_rows.
+    Returns the report DataFrame, identical to the one built from the
+    `_processed.csv` file. If `processed_path` is given, the split
+    intermediate is also written there as a debug artifact.
+    """
+    processed_df = split_rows(raw_df.fillna(''), log_message)
+    if processed_path:
+        processed_df.to_csv(processed_path, index=False, encoding='utf-8-sig')
+        log_message(f"ℹ️ 中间结果已保存到: {os.path.basename(processed_path)}")
+    return format_rows(_read_back(processed_df))
+
+
+def run_report_pipeline(raw_df, outputs, log_message=print, processed_path=None):
+    """
+    Builds the report from `raw_df` and writes it to every entry of `outputs`,
+    each either a path ending in a REPORT_WRITERS extension or a callable
+    taking the report DataFrame and returning where it was written. Returns
+    the list of written outputs, or None if the report is empty.
+    """
+    report_df = build_report(raw_df, log_message, processed_path)
+    if report_df.empty:
+        return None
+    written = []
+    for output in outputs:
+        if callable(output):
+            written.append(output(report_df))
+            continue
+        writer = REPORT_WRITERS.get(os.path.splitext(output)[1].lower())
+        if writer is None:
+            raise ValueError(f"不支持的报告格式: {output}")
+        written.append(writer(report_df, output))
+    return written
+
+
+def create_formatted_report(input_csv_path, logger=None, formats=('.csv',), keep_processed=False):
     """
-    Reads the raw CSV, gets the processed (split) data, intelligently formats it, 
-    and writes to a new final report CSV with '备注' and '网址' columns.
+    Reads the raw CSV, splits and formats it in memory, and writes the final
+    report with '备注' and '网址' columns as `<name>_report<ext>` for every
+    extension in `formats`. The intermediate `<name>_processed.csv` is only
+    written when `keep_processed` is set. Returns the first report path.
     """
     def log_message(msg):
         if logger and hasattr(logger, 'put'):
@@ -67,86 +271,29 @@ def create_formatted_report(input_csv_path, logger=None):
         else:
             print(msg)
 
-    log_message("第一步：调用预处理器拆分行并进行校验...")
-    processed_csv_path = process_file(input_csv_path, logger)
-    if not processed_csv_path:
-        log_message("❌ 预处理（拆分与校验）失败，格式化中止。")
+    if not os.path.exists(input_csv_path):
+        log_message(f"❌ 文件不存在: {input_csv_path}")
         return None
 
     try:
-        log_message(f"第二步：开始智能格式化文件: {os.path.basename(processed_csv_path)}")
-        df = pd.read_csv(processed_csv_path).fillna('')
-
-        formatted_data = []
-        for index, row in df.iterrows():
-            try:
-                remark = ''
-                status = row.get('split_status')
-                
-                # Rule 1: Check split status from post_processor
-                if status == 'mismatched':
-                    remark = '核心参数数量不匹配'
-                elif status == 'attachment':
-                    remark = '参数见附件'
-                
-                # The old "see attachment" text check is now handled by the status 'attachment'
-                # but we can keep it as a fallback just in case.
-                if not remark:
-                    raw_text_fields = [str(row.get(k, '')) for k in ['名称', '规格型号', '数量', '单价']]
-                    if any('详见附件' in field for field in raw_text_fields):
-                        remark = '参数见附件'
-
-                spec, model = parse_spec_and_model(row.get('名称'), row.get('规格型号'))
-                
-                # Final check: Only clean numeric values if the row was successfully split.
-                # Otherwise, preserve the original text to avoid data corruption.
-                if status == 'ok':
-                    quantity = clean_numeric_value(str(row.get('数量')))
-                    unit_price = clean_numeric_value(str(row.get('单价')))
-                else:
-                    quantity = row.get('数量', '')
-                    unit_price = row.get('单价', '')
-
-                new_row = {
-                    '项目名称': row.get('项目名称', 'N/A'),
-                    '中标单位': row.get('供应商名称', 'N/A'),
-                    '品牌': row.get('品牌', 'N/A'),
-                    '规格': spec,
-                    '型号': model,
-                    '数量(台)': quantity,
-                    '中标单价(元)': unit_price,
-                    '中标公示日期': row.get('发布日期', 'N/A'),
-                    '备注': remark,
-                    '网址': row.get('链接', 'N/A')
-                }
-                formatted_data.append(new_row)
-            except Exception as e:
-                log_message(f"❌ 在处理第 {index + 2} 行时发生错误: {e}")
-                log_message(f"    - 问题行数据: {row.to_dict()}")
-                log_message(traceback.format_exc())
-
-        if not formatted_data:
-            log_message("🤷‍♂️ 格式化后没有数据可以写入。")
-            return None
-
-        final_columns = ['项目名称', '中标单位', '品牌', '规格', '型号', '数量(台)', '中标单价(元)', '中标公示日期', '备注', '网址']
-        df_formatted = pd.DataFrame(formatted_data, columns=final_columns + ['split_status'])
-        
-        # --- Final Step: Drop the status column before writing to file ---
-        df_formatted.drop(columns=['split_status'], inplace=True, errors='ignore')
-        
         directory, filename = os.path.split(input_csv_path)
         name, _ = os.path.splitext(filename)
-        output_csv_path = os.path.join(directory, f"{name}_report.csv")
+        processed_path = os.path.join(directory, f"{name}_processed.csv") if keep_processed else None
+        outputs = [os.path.join(directory, f"{name}_report{ext}") for ext in formats]
 
-        log_message("第三步：正在生成最终的CSV报告...")
-        df_formatted.to_csv(output_csv_path, index=False, encoding='utf-8-sig')
-        
-        log_message(f"✅ CSV报告生成成功！文件保存在: {output_csv_path}")
-        return output_csv_path
+        log_message(f"▶️ 开始拆分并格式化文件: {filename}")
+        raw_df = pd.read_csv(input_csv_path)
+        written = run_report_pipeline(raw_df, outputs, log_message, processed_path)
+        if not written:
+            log_message("🤷‍♂️ 格式化后没有数据可以写入。")
+            return None
+
+        for path in written:
+            log_message(f"✅ 报告生成成功！文件保存在: {path}")
+        return written[0]
 
     except Exception as e:
-        log_message(f"❌ 生成CSV报告时发生严重错误: {e}")
+        log_message(f"❌ 生成报告时发生严重错误: {e}")
         log_message(traceback.format_exc())
         return None
 
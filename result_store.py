@@ -0,0 +1,245 @@
+# 结果库：把解析出的记录写入 SQLite，按供应商、项目号、日期、省份建索引，并提供简单的查询命令
+# result_store.py
+
+import argparse
+import csv
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+from config import RESULT_STORE_PATH, RESULT_STORE_BATCH_PAGES
+from seen_index import PARSER_FINGERPRINT_FIELD
+from sinks import STANDARD_COLUMNS
+from utils import parse_date, parse_number
+
+# 发布日期统一保存为 YYYY-MM-DD（无法识别时保留原文），以便按日期范围走索引；金额另存一列数值便于求和
+STORE_COLUMNS = STANDARD_COLUMNS + ["item_index", "金额数值", "run_id", "updated_at", PARSER_FINGERPRINT_FIELD]
+INDEXED_COLUMNS = ["项目号", "供应商名称", "发布日期", "省份"]
+_STOP = object()
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    columns = ",\n".join(
+        f"    {_quote(c)} {'INTEGER NOT NULL' if c == 'item_index' else 'REAL' if c in ('金额数值', 'updated_at') else 'TEXT'}"
+        for c in STORE_COLUMNS
+    )
+    indexes = "\n".join(
+        f"CREATE INDEX IF NOT EXISTS {_quote('idx_records_' + c)} ON records({_quote(c)});" for c in INDEXED_COLUMNS
+    )
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS records (
+        {columns},
+            PRIMARY KEY ("链接", item_index)
+        );
+        {indexes}
+    """)
+    # 旧版本建立的结果库没有解析器指纹列
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(records)")}
+    for column in STORE_COLUMNS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE records ADD COLUMN {_quote(column)} TEXT")
+    conn.commit()
+    return conn
+
+
+def _store_row(record, item_index, run_id, now):
+    row = []
+    for column in STANDARD_COLUMNS:
+        value = record.get(column)
+        if value is not None and value == value:  # value == value: 不是 NaN
+            value = str(value)
+        else:
+            value = None
+        if column == "发布日期" and value:
+            published = parse_date(value)
+            value = published.isoformat() if published else value
+        row.append(value)
+    return row + [item_index, parse_number(record.get("中标金额")), run_id, now, record.get(PARSER_FINGERPRINT_FIELD)]
+
+
+class ResultStore:
+    """
+    An SQLite store of parsed records, keyed by (链接, item_index) where
+    item_index is the position of the record among the records parsed from
+    that announcement. Writing an announcement again (a re-crawl, a resumed
+    run, another batch job) replaces its records instead of duplicating them,
+    and drops items it no longer yields.
+
+    The database runs in WAL mode, so queries can run while a crawl writes.
+    `write()` only queues the records: a single writer thread applies them in
+    batched transactions, so the crawl pipeline never waits on disk I/O. Has
+    the same write/close/abort interface as the CSV/JSONL sinks; `close()`
+    waits until every queued record is committed.
+    """
+    def __init__(self, path=RESULT_STORE_PATH, run_id=None, batch_pages=RESULT_STORE_BATCH_PAGES):
+        self.path = path
+        self.run_id = run_id
+        self.batch_pages = batch_pages
+        self.count = 0
+        self._error = None
+        self._queue = queue.Queue(maxsize=1000)
+        self._conn = _connect(path)
+        self._thread = threading.Thread(target=self._writer, name="result-store-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, records):
+        """Queues the records of one announcement (all sharing the same 链接) for upserting."""
+        if self._error:
+            raise self._error
+        if not records:
+            return
+        self._queue.put(list(records))
+        self.count += len(records)
+
+    def _writer(self):
+        stopping = False
+        while not stopping:
+            batches = [self._queue.get()]
+            # 把已排队的记录合并到同一个事务中提交
+            while len(batches) < self.batch_pages:
+                try:
+                    batches.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batches[-1] is _STOP:
+                batches.pop()
+                stopping = True
+            if batches and not self._error:
+                try:
+                    self._upsert(batches)
+                except Exception as e:
+                    # 出错后继续取出队列中的记录（丢弃），write() 不会因队列已满而阻塞
+                    self._error = e
+
+    def _upsert(self, batches):
+        now = time.time()
+        rows = []
+        stale = []
+        for records in batches:
+            by_link = {}
+            for record in records:
+                by_link.setdefault(str(record.get("链接") or ""), []).append(record)
+            for link, items in by_link.items():
+                rows.extend(_store_row(r, i, self.run_id, now) for i, r in enumerate(items))
+                stale.append((link, len(items)))
+        columns = ", ".join(_quote(c) for c in STORE_COLUMNS)
+        updates = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in STORE_COLUMNS if c not in ("链接", "item_index"))
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO records ({columns}) VALUES ({', '.join('?' * len(STORE_COLUMNS))}) "
+                f"ON CONFLICT(\"链接\", item_index) DO UPDATE SET {updates}",
+                rows,
+            )
+            # 公告重新解析后条目变少时，删除多出来的旧条目
+            self._conn.executemany('DELETE FROM records WHERE "链接" = ? AND item_index >= ?', stale)
+
+    def close(self):
+        """Commits everything queued and closes the database. Returns the database path, or None if nothing was written."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._error:
+            raise self._error
+        return self.path if self.count else None
+
+    def abort(self):
+        """Commits what has been queued so far; upserts make it safe to write the same announcements again later."""
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def query_records(path=RESULT_STORE_PATH, supplier=None, project_no=None, province=None,
+                  since=None, until=None, keyword=None, limit=None):
+    """
+    Returns the stored records matching every given filter, newest first, as
+    dicts with the standard columns. `supplier` and `project_no` match exactly
+    unless they contain a `%` wildcard; `since`/`until` are inclusive
+    YYYY-MM-DD dates; `keyword` is a substring of 项目名称.
+    """
+    conditions, params = [], []
+    for column, value in (("供应商名称", supplier), ("项目号", project_no), ("省份", province)):
+        if value:
+            conditions.append(f"{_quote(column)} {'LIKE' if '%' in value else '='} ?")
+            params.append(value)
+    if since:
+        conditions.append('"发布日期" >= ?')
+        params.append(parse_date(since).isoformat())
+    if until:
+        conditions.append('"发布日期" <= ?')
+        params.append(parse_date(until).isoformat())
+    if keyword:
+        conditions.append('"项目名称" LIKE ?')
+        params.append(f"%{keyword}%")
+    sql = f"SELECT {', '.join(_quote(c) for c in STANDARD_COLUMNS + ['金额数值'])} FROM records"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += ' ORDER BY "发布日期" DESC, "链接", item_index'
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        cursor = conn.execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    """查询结果库: python main.py query --supplier 某某公司 --since 2025-04-01 --until 2025-06-30"""
+    parser = argparse.ArgumentParser(prog="main.py query", description="查询结果库中的采购记录")
+    parser.add_argument("--db", default=RESULT_STORE_PATH, help=f"结果库路径 (默认 {RESULT_STORE_PATH})")
+    parser.add_argument("--supplier", help="供应商名称（可用 % 通配）")
+    parser.add_argument("--project-no", help="项目号（可用 % 通配）")
+    parser.add_argument("--province", help="省份（中文）")
+    parser.add_argument("--since", help="发布日期起 (YYYY-MM-DD)")
+    parser.add_argument("--until", help="发布日期止 (YYYY-MM-DD)")
+    parser.add_argument("--keyword", help="项目名称包含的关键词")
+    parser.add_argument("--limit", type=int, default=50, help="最多显示的记录数，0 表示不限 (默认 50)")
+    parser.add_argument("--csv", metavar="FILE", help="把查询结果写入 CSV 文件")
+    args = parser.parse_args(argv)
+
+    for value, name in ((args.since, "--since"), (args.until, "--until")):
+        if value and parse_date(value) is None:
+            parser.error(f"{name} 日期格式无效: {value}")
+    try:
+        started = time.perf_counter()
+        rows = query_records(args.db, args.supplier, args.project_no, args.province,
+                             args.since, args.until, args.keyword, args.limit or None)
+        elapsed = (time.perf_counter() - started) * 1000
+    except sqlite3.OperationalError as e:
+        print(f"❌ 无法查询结果库 {args.db}: {e}")
+        return 1
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=STANDARD_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        for row in rows:
+            print(f"{row['发布日期']}  {row['省份'] or ''}  {row['供应商名称'] or ''}  {row['中标金额'] or ''}  "
+                  f"{row['项目名称'] or ''}  {row['名称'] or ''}  {row['链接']}")
+    # 同一公告的各条目重复记录了供应商的中标金额，合计时每个 (公告, 供应商) 只计一次
+    amounts = {(row["链接"], row["供应商名称"]): row["金额数值"] or 0 for row in rows}
+    total = sum(amounts.values())
+    print(f"🔍 共 {len(rows)} 条记录（{elapsed:.1f} 毫秒），中标金额合计 {total:,.2f}" + (f"，已写入 {args.csv}" if args.csv else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
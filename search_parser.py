@@ -2,8 +2,16 @@
 # search_parser.py
 
 from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+import math
+import re
 import time
 
+from config import LIST_CACHE_TTL, LIST_WORKERS, RESULTS_PER_PAGE, LIST_PAGE_RETRIES, LIST_RETRY_DELAY
+from fetcher import fetch_html
+from url_builder import build_ccgp_search_url
+
 def parse_search_results(driver, url, max_pages=50):
     """抓取搜索页中的所有公告链接与基本信息"""
     results = []
@@ -28,3 +36,138 @@ def parse_search_results(driver, url, max_pages=50):
             })
 
     return results
+
+
+# 列表页就绪判断：出现结果链接，或出现"无数据"提示
+LIST_READY_SELECTOR = ".vT-srch-result-list-bid li a"
+NO_DATA_TEXT = "抱歉，没有找到相关数据"
+
+
+def parse_list_page(html, base_url):
+    """
+    解析一页搜索结果 HTML。
+
+    Returns:
+        (links, has_next_page, no_data): 本页的详情页绝对链接列表、是否存在"下一页"、
+        以及页面是否为"没有找到相关数据"的提示页。
+    """
+    if NO_DATA_TEXT in html:
+        return [], False, True
+    soup = BeautifulSoup(html, 'lxml')
+    links = [urljoin(base_url, a['href']) for a in soup.select(LIST_READY_SELECTOR) if a.get('href')]
+    has_next_page = soup.find('a', string=lambda s: s and s.strip() == '下一页') is not None
+    return links, has_next_page, False
+
+
+class ListPageError(Exception):
+    """Raised when list pages of a date window still fail to load after retries, so the window is not complete."""
+
+
+def parse_result_count(html):
+    """从搜索结果页中解析命中总数（"共找到 N 条内容"），无法识别时返回 None。"""
+    match = re.search(r'共找到\s*(?:<[^>]+>\s*)*([\d,]+)\s*(?:<[^>]+>\s*)*条', html)
+    return int(match.group(1).replace(',', '')) if match else None
+
+
+def parse_page_count(html):
+    """从搜索结果页中解析总页数，优先读取分页脚本中的 size，其次由命中总数推算；无法识别时返回 None。"""
+    match = re.search(r'Pager\(\s*\{\s*size\s*:\s*(\d+)', html)
+    if match:
+        return int(match.group(1))
+    hits = parse_result_count(html)
+    if hits is not None:
+        return max(1, math.ceil(hits / RESULTS_PER_PAGE))
+    return None
+
+
+def fetch_list_page(province_cn, keyword, start_date, end_date, page, retries=LIST_PAGE_RETRIES):
+    """抓取一页搜索结果，返回 (url, html)；加载失败时重试 `retries` 次，仍失败时 html 为 None。"""
+    search_url = build_ccgp_search_url(province_cn, start_date, end_date, keyword, page)
+    html = None
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(LIST_RETRY_DELAY * attempt)
+        html = fetch_html(search_url, LIST_READY_SELECTOR, province="search", timeout=10,
+                          ready_text=NO_DATA_TEXT, cache_ttl=LIST_CACHE_TTL)
+        if html:
+            break
+    return search_url, html
+
+
+def collect_list_links(province_cn, keyword, start_date, end_date, frontier, logger, list_workers=LIST_WORKERS, first_page=None):
+    """
+    抓取一个日期窗口内的全部搜索结果页，并把详情页链接加入 frontier。
+
+    先抓取第 1 页并读取总页数，其余页面按 page_index 直接构造 URL 并发抓取（经由
+    fetcher 的按域名限速），结果仍按页码顺序加入 frontier，以保持链接的首次出现顺序。
+    若第 1 页无法识别总页数，则退回到按"下一页"逐页抓取。`first_page` 可传入已抓取的
+    第 1 页 (url, html)，避免重复请求。
+
+    每页加载失败时先重试；重试后仍有页面失败时，其余页面的链接照常加入 frontier，
+    最后抛出 ListPageError，调用方不应把该窗口记为已完成。
+    """
+    logger.info(f"\n📄 正在抓取列表页 第 1 页 ({start_date} ~ {end_date})...")
+    search_url, html = first_page if first_page and first_page[1] else \
+        fetch_list_page(province_cn, keyword, start_date, end_date, 1)
+    if not html:
+        raise ListPageError(f"{start_date} ~ {end_date} 的列表页 第 1 页在重试后仍加载失败")
+
+    page_links, has_next_page, no_data = parse_list_page(html, search_url)
+    if no_data or not page_links:
+        logger.info("📭 在起始页未找到任何数据。")
+        return
+    new_count = frontier.extend(page_links)
+    logger.info(f"    找到 {len(page_links)} 个链接（新增 {new_count} 个），累计 {len(frontier)} 个。")
+    if not has_next_page:
+        logger.info("✅ 没有'下一页'按钮，列表抓取完成。")
+        return
+
+    total_pages = parse_page_count(html)
+    if total_pages is None:
+        logger.info("ℹ️ 未能识别总页数，改为逐页抓取。")
+        _walk_pages_serially(province_cn, keyword, start_date, end_date, frontier, logger, start_page=2)
+        return
+
+    logger.info(f"    共 {total_pages} 页，并发抓取剩余 {total_pages - 1} 页...")
+    pages = range(2, total_pages + 1)
+    fetch_page = lambda page: fetch_list_page(province_cn, keyword, start_date, end_date, page)
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, list_workers)) as executor:
+        for page, (search_url, html) in zip(pages, executor.map(fetch_page, pages)):
+            if not html:
+                logger.warning(f"    [警告] 列表页 第 {page} 页在重试后仍加载失败。")
+                failed.append(page)
+                continue
+            page_links, _, no_data = parse_list_page(html, search_url)
+            if no_data:
+                continue
+            new_count = frontier.extend(page_links)
+            logger.info(f"    📄 第 {page}/{total_pages} 页: 找到 {len(page_links)} 个链接（新增 {new_count} 个），累计 {len(frontier)} 个。")
+    if failed:
+        raise ListPageError(f"{start_date} ~ {end_date} 的列表页 第 {', '.join(map(str, failed))} 页在重试后仍加载失败")
+    logger.info("✅ 列表抓取完成。")
+
+
+def _walk_pages_serially(province_cn, keyword, start_date, end_date, frontier, logger, start_page):
+    page = start_page
+    while True:
+        logger.info(f"\n📄 正在抓取列表页 第 {page} 页...")
+        search_url, html = fetch_list_page(province_cn, keyword, start_date, end_date, page)
+        if not html:
+            raise ListPageError(f"{start_date} ~ {end_date} 的列表页 第 {page} 页在重试后仍加载失败")
+
+        page_links, has_next_page, no_data = parse_list_page(html, search_url)
+        if no_data:
+            logger.info("✅ 已到达结果末尾，列表抓取完成。")
+            break
+        if not page_links:
+            logger.info("📭 当前页没有找到链接，可能已是最后一页。")
+            break
+
+        new_count = frontier.extend(page_links)
+        logger.info(f"    找到 {len(page_links)} 个链接（新增 {new_count} 个），累计 {len(frontier)} 个。")
+
+        if not has_next_page:
+            logger.info("✅ 没有'下一页'按钮，列表抓取完成。")
+            break
+        page += 1
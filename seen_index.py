@@ -0,0 +1,120 @@
+# 已抓取公告索引（增量抓取时跳过已处理过的详情页）
+# seen_index.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from config import SEEN_INDEX_PATH
+from url_builder import announcement_key
+
+# 记录中保存解析器指纹的字段（不属于标准输出列，CSV/JSONL 中不会出现）
+PARSER_FINGERPRINT_FIELD = "parser_fingerprint"
+_PARSERS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "detail_parsers")
+
+
+class SeenIndex:
+    """
+    A persistent SQLite index of announcements that have already been fetched
+    and parsed, keyed by `url_builder.announcement_key` so mirror and
+    re-written links of the same announcement share one entry.
+
+    Each entry keeps the canonical URL, when it was fetched, the SHA-256 of the
+    page, the parser that produced its records (class and source fingerprint)
+    and how many records it gave.
+    The index may be shared by several processes (e.g. batch jobs); writes are
+    serialised by SQLite.
+    """
+    def __init__(self, path=SEEN_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS seen (
+                key            TEXT PRIMARY KEY,
+                url            TEXT NOT NULL,
+                province       TEXT,
+                fetched_at     REAL NOT NULL,
+                content_hash   TEXT,
+                parser_version TEXT,
+                record_count   INTEGER NOT NULL DEFAULT 0,
+                parser_fingerprint TEXT
+            );
+        """)
+        # 旧版本建立的索引没有 parser_fingerprint 列
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(seen)")}
+        if "parser_fingerprint" not in columns:
+            self._conn.execute("ALTER TABLE seen ADD COLUMN parser_fingerprint TEXT")
+        self._conn.commit()
+
+    def get(self, url):
+        """Returns the index entry for `url` as a dict, or None if it has not been seen."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, province, fetched_at, content_hash, parser_version, record_count, parser_fingerprint "
+                "FROM seen WHERE key = ?",
+                (announcement_key(url),),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("url", "province", "fetched_at", "content_hash", "parser_version", "record_count",
+                         "parser_fingerprint"), row))
+
+    def __contains__(self, url):
+        return self.get(url) is not None
+
+    def record_many(self, entries):
+        """
+        Adds or replaces entries. Each entry is a dict with url, province,
+        content_hash, parser_version, record_count and optionally fetched_at
+        and parser_fingerprint.
+        """
+        now = time.time()
+        rows = [
+            (announcement_key(e["url"]), e["url"], e.get("province"), e.get("fetched_at", now),
+             e.get("content_hash"), e.get("parser_version"), e.get("record_count", 0), e.get("parser_fingerprint"))
+            for e in entries
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO seen (key, url, province, fetched_at, content_hash, parser_version, record_count, "
+                "parser_fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def parser_version(parser_instance):
+    """Identifies the parser that produced a page's records, stored alongside each index entry."""
+    parser_class = type(parser_instance)
+    return f"{parser_class.__module__}.{parser_class.__name__}"
+
+
+def parser_fingerprint(province_pinyin):
+    """
+    Returns the SHA-256 (first 16 hex digits) of the province parser's source,
+    detail_parsers/<province>.py, or None if there is no such module. It
+    changes whenever that module is edited, so records parsed by an older
+    version of the parser can be found and re-parsed.
+    """
+    try:
+        with open(os.path.join(_PARSERS_DIR, f"{province_pinyin}.py"), "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        return None
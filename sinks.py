@@ -0,0 +1,105 @@
+# 结果输出：边解析边写出的 CSV / JSONL 文件
+# sinks.py
+
+import csv
+import json
+import os
+import threading
+
+# 输出文件的标准列顺序
+STANDARD_COLUMNS = [
+    "发布日期", "项目号", "采购方式", "项目名称", "供应商名称",
+    "中标金额", "名称", "品牌", "规格型号", "数量", "单价",
+    "链接", "省份"
+]
+MISSING_VALUE = "N/A"
+SINK_FORMATS = ("csv", "jsonl")
+
+
+class _FileSink:
+    """
+    Base class of the streaming sinks. Records are appended to `<path>.part`
+    and flushed as they arrive, so partial results are visible while the crawl
+    runs; `close()` atomically renames the part file to `path`.
+    """
+    extension = ""
+
+    def __init__(self, path, columns=STANDARD_COLUMNS):
+        self.path = path
+        self.part_path = path + ".part"
+        self.columns = list(columns)
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = self._open()
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _write_row(self, row):
+        raise NotImplementedError
+
+    def _row(self, record):
+        row = {}
+        for column in self.columns:
+            value = record.get(column)
+            row[column] = MISSING_VALUE if value is None or value != value else value  # value != value: NaN
+        return row
+
+    def write(self, records):
+        """Appends `records` (dicts) in the standard column order; unknown keys are dropped."""
+        if not records:
+            return
+        with self._lock:
+            for record in records:
+                self._write_row(self._row(record))
+            self.count += len(records)
+            self._file.flush()
+
+    def close(self):
+        """
+        Finishes the file. Returns its path, or None if nothing was written
+        (in which case no file is left behind).
+        """
+        with self._lock:
+            self._file.close()
+            if not self.count:
+                os.remove(self.part_path)
+                return None
+            os.replace(self.part_path, self.path)
+            return self.path
+
+    def abort(self):
+        """Closes the file but keeps the partial `.part` output for inspection."""
+        with self._lock:
+            self._file.close()
+
+
+class CsvSink(_FileSink):
+    extension = ".csv"
+
+    def _open(self):
+        f = open(self.part_path, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(f)
+        self._writer.writerow(self.columns)
+        return f
+
+    def _write_row(self, row):
+        self._writer.writerow([row[column] for column in self.columns])
+
+
+class JsonlSink(_FileSink):
+    extension = ".jsonl"
+
+    def _open(self):
+        return open(self.part_path, "w", encoding="utf-8")
+
+    def _write_row(self, row):
+        self._file.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+
+
+def open_sink(base_path, fmt="csv", columns=STANDARD_COLUMNS):
+    """Opens a sink of format `fmt` writing to `base_path` plus the format's extension."""
+    sink_class = {"csv": CsvSink, "jsonl": JsonlSink}.get(fmt)
+    if sink_class is None:
+        raise ValueError(f"未知的输出格式: {fmt}")
+    return sink_class(base_path + sink_class.extension, columns)
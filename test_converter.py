@@ -0,0 +1,53 @@
+# 转换测试：分块、分工作表写出的 XLSX 与整个 CSV 一次读入时的单元格值一致
+# test_converter.py
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+import tempfile
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from converter import convert_csv_to_xlsx
+
+CSV_TEXT = """项目号,项目名称,中标金额,数量,备注
+001,空调采购,100,1,
+A03,电脑采购,200,2,已验收
+002,打印机采购,300.5,,
+0123,空调采购,400,4,
+B-7,服务器采购,,5,
+"""
+
+
+def expected_rows(csv_path):
+    """原 pd.read_csv + to_excel 写出的单元格：整个文件一次推断类型，空值为空单元格。"""
+    df = pd.read_csv(csv_path, encoding='utf-8-sig')
+    return [list(df.columns)] + [
+        [None if pd.isna(value) else value for value in row] for row in df.astype(object).itertuples(index=False)
+    ]
+
+
+def test_chunked_multi_sheet_matches_csv():
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'data.csv')
+        with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f:
+            f.write(CSV_TEXT)
+        xlsx_path, row_count, sheet_count = convert_csv_to_xlsx(csv_path, chunk_rows=2, max_rows_per_sheet=3)
+        assert (row_count, sheet_count) == (5, 2)
+
+        expected = expected_rows(csv_path)
+        workbook = load_workbook(xlsx_path, read_only=True)
+        # 只读模式不返回行尾的空单元格，按表头补齐
+        width = len(expected[0])
+        sheets = [[list(row) + [None] * (width - len(row)) for row in sheet.iter_rows(values_only=True)]
+                  for sheet in workbook.worksheets]
+        workbook.close()
+        assert [sheet[0] for sheet in sheets] == [expected[0]] * 2
+        assert sheets[0][1:] + sheets[1][1:] == expected[1:], sheets
+        assert [row[0] for row in expected[1:]] == ['001', 'A03', '002', '0123', 'B-7']
+
+
+if __name__ == '__main__':
+    test_chunked_multi_sheet_matches_csv()
+    print("✅ 分块、分工作表转换的 XLSX 与 CSV 的单元格值一致")
@@ -0,0 +1,47 @@
+# 崩溃隔离测试：一个页面让解析进程崩溃时，与它同时解析的正常页面仍能解析成功
+# test_parse_pool.py
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import parse_pool
+from parse_pool import ParsePool, ParseError
+
+
+def fake_parse_html(province_pinyin, link, html):
+    """代替省份解析器：html 为 'crash' 时直接结束工作进程，否则稍作停顿后返回一条记录。"""
+    if html == 'crash':
+        os._exit(1)
+    time.sleep(0.2)
+    return [{'链接': link}]
+
+
+def parse_all(pool, pages):
+    def parse(page):
+        try:
+            return pool.parse('test', page, page)
+        except ParseError as e:
+            return e
+    with ThreadPoolExecutor(max_workers=len(pages)) as threads:
+        return dict(zip(pages, threads.map(parse, pages)))
+
+
+def test_crash_does_not_fail_siblings():
+    parse_pool.parse_html = fake_parse_html
+    pages = ['a', 'b', 'c', 'crash', 'd', 'e', 'f', 'g']
+    pool = ParsePool(3, timeout=5)
+    try:
+        for _ in range(3):
+            results = parse_all(pool, pages)
+            assert isinstance(results.pop('crash'), ParseError)
+            assert results == {page: [{'链接': page}] for page in pages if page != 'crash'}, results
+    finally:
+        pool.close()
+
+
+if __name__ == '__main__':
+    test_crash_does_not_fail_siblings()
+    print("✅ 解析进程崩溃时，同时解析的正常页面不受影响")
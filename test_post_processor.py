@@ -0,0 +1,138 @@
+# 等价性测试：向量化的 post_processor.split_rows 与原逐行实现的结果一致
+# test_post_processor.py
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+import io
+import re
+
+import pandas as pd
+
+from post_processor import split_rows
+
+
+def reference_split_rows(df):
+    """原 process_file 中基于 iterrows 的逐行拆分逻辑（仅去掉了日志），作为对照实现。"""
+    new_rows = []
+    prioritized_delimiters = [';', '；', '、', '\n', '|']
+
+    for index, row in df.iterrows():
+        row_dict = row.to_dict()
+
+        name_str = str(row_dict.get('名称', '')).strip()
+        brand_str = str(row_dict.get('品牌', '')).strip()
+        spec_str = str(row_dict.get('规格型号', '')).strip()
+        count_str = str(row_dict.get('数量', '')).strip()
+        price_str = str(row_dict.get('单价', '')).strip()
+
+        if any('详见附件' in s for s in [name_str, spec_str, count_str, price_str]):
+            row_dict['split_status'] = 'attachment'
+            new_rows.append(row_dict)
+            continue
+
+        split_successful = False
+        for delim in prioritized_delimiters:
+            specs = [s.strip() for s in re.split(re.escape(delim), spec_str) if s.strip()]
+            counts = [s.strip() for s in re.split(re.escape(delim), count_str) if s.strip()]
+            prices = [s.strip() for s in re.split(re.escape(delim), price_str) if s.strip()]
+
+            core_lengths = [len(specs), len(counts), len(prices)]
+            is_core_aligned = len(set(core_lengths)) == 1
+            num_items = core_lengths[0] if is_core_aligned else 0
+
+            if is_core_aligned and num_items > 1:
+                names = [s.strip() for s in re.split(re.escape(delim), name_str) if s.strip()]
+                brands = [s.strip() for s in re.split(re.escape(delim), brand_str) if s.strip()]
+                non_core_lengths = [len(names), len(brands)]
+
+                are_non_core_valid = all(l == 1 or l == num_items for l in non_core_lengths)
+
+                if are_non_core_valid:
+                    for i in range(num_items):
+                        new_item = row_dict.copy()
+                        new_item['名称'] = names[i if len(names) == num_items else 0]
+                        new_item['品牌'] = brands[i if len(brands) == num_items else 0]
+                        new_item['规格型号'] = specs[i]
+                        new_item['数量'] = counts[i]
+                        new_item['单价'] = prices[i]
+                        new_item['split_status'] = 'ok'
+                        new_rows.append(new_item)
+
+                    split_successful = True
+                    break
+
+        if not split_successful:
+            all_lengths = [len(re.split(r'[、；;\n|]', s)) for s in [name_str, brand_str, spec_str, count_str, price_str]]
+            is_single = all(l <= 1 for l in all_lengths)
+            row_dict['split_status'] = 'single_item' if is_single else 'mismatched'
+            new_rows.append(row_dict)
+
+    return pd.DataFrame(new_rows)
+
+
+FIXTURE_ROWS = [
+    # 单条记录（数量、单价为数字）
+    {'名称': '空调', '品牌': '格力', '规格型号': 'KFR-35GW', '数量': 2, '单价': 3200},
+    # 分号拆分，名称与品牌各一项
+    {'名称': '空调', '品牌': '美的', '规格型号': 'A1;A2;A3', '数量': '1;2;3', '单价': '100;200;300'},
+    # 全角分号拆分，名称与品牌逐项对应
+    {'名称': '挂机；柜机', '品牌': '格力；美的', '规格型号': '1.5P；3P', '数量': '4；5', '单价': '2999；6999'},
+    # 顿号拆分，首尾多余分隔符与空白
+    {'名称': '空调', '品牌': '海尔', '规格型号': ' X1 、X2、 ', '数量': '1、1', '单价': '10、20'},
+    # 换行拆分
+    {'名称': '空调', '品牌': '海信', '规格型号': 'H1\nH2', '数量': '3\n4', '单价': '500\n600'},
+    # 竖线拆分
+    {'名称': '空调|风扇', '品牌': '格力', '规格型号': 'G1|F1', '数量': '1|2', '单价': '1|2'},
+    # 分号对不齐，但顿号可以对齐（按优先级回退）
+    {'名称': '空调', '品牌': '格力', '规格型号': 'A;B、C', '数量': '1、2', '单价': '3、4'},
+    # 核心列数量不一致
+    {'名称': '空调', '品牌': '格力', '规格型号': 'A;B;C', '数量': '1;2', '单价': '3;4;5'},
+    # 核心列对齐，但品牌项数既不是 1 也不等于条目数
+    {'名称': '空调', '品牌': '格力;美的;海尔', '规格型号': 'A;B', '数量': '1;2', '单价': '3;4'},
+    # 名称为空时不拆分
+    {'名称': '', '品牌': '格力', '规格型号': 'A;B', '数量': '1;2', '单价': '3;4'},
+    # 详见附件
+    {'名称': '空调', '品牌': '格力', '规格型号': '详见附件', '数量': '1;2', '单价': '3;4'},
+    # 只有品牌含分隔符
+    {'名称': '空调', '品牌': '格力、美的', '规格型号': 'A', '数量': '1', '单价': '2'},
+    # 缺失值
+    {'名称': '空调', '品牌': None, '规格型号': None, '数量': None, '单价': None},
+    # 核心列只有一项时不拆分
+    {'名称': '空调;风扇', '品牌': '格力', '规格型号': 'A;', '数量': '1', '单价': '2'},
+]
+
+
+def load_fixture():
+    """与 process_file 相同：经由 CSV 读取，使列的类型与实际文件一致。"""
+    base = {'发布日期': '2025-06-11', '项目号': 'P-1', '项目名称': '空调采购', '供应商名称': '某公司', '中标金额': '1000'}
+    rows = [dict(base, **row, 链接=f'https://www.ccgp.gov.cn/t20250611_{i}.htm') for i, row in enumerate(FIXTURE_ROWS)]
+    buffer = io.StringIO()
+    pd.DataFrame(rows).to_csv(buffer, index=False)
+    buffer.seek(0)
+    return pd.read_csv(buffer).fillna('')
+
+
+def as_csv(df):
+    return df.to_csv(index=False)
+
+
+def test_split_rows_matches_reference():
+    df = load_fixture()
+    expected = reference_split_rows(df)
+    actual = split_rows(df, log_message=lambda msg: None)
+    assert list(actual.columns) == list(expected.columns)
+    assert as_csv(actual) == as_csv(expected)
+
+
+def test_split_rows_matches_reference_on_repeated_rows():
+    df = pd.concat([load_fixture()] * 50, ignore_index=True)
+    expected = reference_split_rows(df)
+    actual = split_rows(df, log_message=lambda msg: None)
+    assert as_csv(actual) == as_csv(expected)
+
+
+if __name__ == '__main__':
+    test_split_rows_matches_reference()
+    test_split_rows_matches_reference_on_repeated_rows()
+    print("✅ split_rows 与逐行实现的输出一致")
@@ -0,0 +1,165 @@
+# 等价性测试：列式的 report_generator.format_rows 与原逐行实现生成的报告逐字节一致，
+# 内存中的报告流程 (build_report / create_formatted_report) 与原先经由 _processed.csv 的文件流程一致
+# test_report_generator.py
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+import io
+import tempfile
+
+import pandas as pd
+
+from post_processor import split_rows, process_file
+from report_generator import (format_rows, parse_spec_and_model, clean_numeric_value, FINAL_COLUMNS,
+                              build_report, create_formatted_report)
+from test_post_processor import load_fixture
+
+
+def reference_format_rows(df):
+    """原 create_formatted_report 中基于 iterrows 的逐行格式化逻辑（仅去掉了日志），作为对照实现。"""
+    formatted_data = []
+    for index, row in df.iterrows():
+        remark = ''
+        status = row.get('split_status')
+        if status == 'mismatched':
+            remark = '核心参数数量不匹配'
+        elif status == 'attachment':
+            remark = '参数见附件'
+        if not remark:
+            raw_text_fields = [str(row.get(k, '')) for k in ['名称', '规格型号', '数量', '单价']]
+            if any('详见附件' in field for field in raw_text_fields):
+                remark = '参数见附件'
+
+        spec, model = parse_spec_and_model(row.get('名称'), row.get('规格型号'))
+        if status == 'ok':
+            quantity = clean_numeric_value(str(row.get('数量')))
+            unit_price = clean_numeric_value(str(row.get('单价')))
+        else:
+            quantity = row.get('数量', '')
+            unit_price = row.get('单价', '')
+
+        formatted_data.append({
+            '项目名称': row.get('项目名称', 'N/A'),
+            '中标单位': row.get('供应商名称', 'N/A'),
+            '品牌': row.get('品牌', 'N/A'),
+            '规格': spec,
+            '型号': model,
+            '数量(台)': quantity,
+            '中标单价(元)': unit_price,
+            '中标公示日期': row.get('发布日期', 'N/A'),
+            '备注': remark,
+            '网址': row.get('链接', 'N/A')
+        })
+    df_formatted = pd.DataFrame(formatted_data, columns=FINAL_COLUMNS + ['split_status'])
+    df_formatted.drop(columns=['split_status'], inplace=True, errors='ignore')
+    return df_formatted
+
+
+SPEC_MODEL_ROWS = [
+    {'名称': '空调', '规格型号': '挂式空调（KFR-35GW）'},
+    {'名称': '空调', '规格型号': '1.5P (KFR-35GW/NhGc1B)'},
+    {'名称': '空调', '规格型号': '规格：1.5匹 型号：KFR-35'},
+    {'名称': '空调', '规格型号': '型号：KFR-72LW'},
+    {'名称': '空调', '规格型号': '1.5匹挂机KFR-35GW'},
+    {'名称': '空调', '规格型号': 'KFR-35GW/BP3'},
+    {'名称': '空调', '规格型号': '壁挂式变频冷暖空调'},
+    {'名称': '空调', '规格型号': 'N/A'},
+    {'名称': '空调', '规格型号': ''},
+    {'名称': '空调', '规格型号': '见清单\n（附件）'},
+    {'名称': '空调', '规格型号': '壁挂式空调机组型号AB12'},
+]
+NUMERIC_ROWS = [
+    {'数量': '2台;3台', '单价': '3,200.00元;4500.5元'},
+    {'数量': '1;N/A', '单价': '约1.2.3;100'},
+    {'数量': '２;3', '单价': '.;0.1'},
+]
+
+
+def load_raw_fixture():
+    """爬虫输出的原始数据：post_processor 的测试数据加上规格型号、数值清洗的各种情况。"""
+    base = {'发布日期': '2025-06-11', '项目号': 'P-1', '项目名称': '空调采购', '供应商名称': '某公司', '中标金额': '1000',
+            '品牌': '格力', '数量': '1', '单价': '100', '链接': 'https://www.ccgp.gov.cn/t20250611_1.htm'}
+    extra = pd.DataFrame([dict(base, **row) for row in SPEC_MODEL_ROWS]
+                         + [dict(base, 名称='空调', 规格型号='A;B', **row) for row in NUMERIC_ROWS])
+    return pd.concat([load_fixture(), extra], ignore_index=True)
+
+
+def load_mixed_type_fixture():
+    """原始数据中数字与文本混在一列：拆分后 规格型号、数量、单价 全是数字，读回 CSV 时会被推断为数值列。"""
+    base = {'发布日期': '2025-06-11', '项目号': 'P-2', '项目名称': '空调采购', '供应商名称': '某公司', '中标金额': '1000',
+            '品牌': '格力', '链接': 'https://www.ccgp.gov.cn/t20250611_2.htm'}
+    return pd.DataFrame([
+        dict(base, 名称='空调;冰箱;电视', 规格型号='100;200;300.00', 数量='1;2;3', 单价='100;200;300.00'),
+        dict(base, 名称='空调', 规格型号=5, 数量=1, 单价=100),
+    ])
+
+
+def load_report_fixture():
+    """拆分后的数据，与原先基于文件的流程相同：split_rows 的结果写成 CSV 后再读回。"""
+    df = load_raw_fixture().fillna('')
+    buffer = io.StringIO()
+    split_rows(df, log_message=lambda msg: None).to_csv(buffer, index=False)
+    buffer.seek(0)
+    return pd.read_csv(buffer).fillna('')
+
+
+def as_csv(df):
+    return df.to_csv(index=False)
+
+
+def test_format_rows_matches_reference():
+    df = load_report_fixture()
+    assert as_csv(format_rows(df)) == as_csv(reference_format_rows(df))
+
+
+def test_format_rows_matches_reference_on_repeated_rows():
+    df = pd.concat([load_report_fixture()] * 50, ignore_index=True)
+    assert as_csv(format_rows(df)) == as_csv(reference_format_rows(df))
+
+
+class QuietLogger:
+    def put(self, message):
+        pass
+
+
+def file_based_report(raw_csv_path):
+    """原 create_formatted_report 的文件流程：process_file 写出 _processed.csv，读回后格式化并写出报告。"""
+    processed_path = process_file(raw_csv_path, QuietLogger())
+    df = pd.read_csv(processed_path).fillna('')
+    buffer = io.StringIO()
+    format_rows(df).to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+
+def test_build_report_matches_file_based_path():
+    for load_raw in (load_raw_fixture, load_mixed_type_fixture):
+        with tempfile.TemporaryDirectory() as directory:
+            raw_csv_path = os.path.join(directory, 'raw.csv')
+            load_raw().to_csv(raw_csv_path, index=False, encoding='utf-8-sig')
+            expected = file_based_report(raw_csv_path)
+            raw_df = pd.read_csv(raw_csv_path)
+            assert as_csv(build_report(raw_df, log_message=lambda msg: None)) == expected, load_raw.__name__
+
+
+def test_create_formatted_report_matches_file_based_path():
+    for load_raw in (load_raw_fixture, load_mixed_type_fixture):
+        with tempfile.TemporaryDirectory() as directory:
+            raw_csv_path = os.path.join(directory, 'raw.csv')
+            load_raw().to_csv(raw_csv_path, index=False, encoding='utf-8-sig')
+            expected = file_based_report(raw_csv_path)
+            os.remove(raw_csv_path[:-4] + '_processed.csv')
+            report_path = create_formatted_report(raw_csv_path, QuietLogger())
+            assert report_path == os.path.join(directory, 'raw_report.csv')
+            assert not os.path.exists(raw_csv_path[:-4] + '_processed.csv')
+            with open(report_path, encoding='utf-8-sig', newline='') as f:
+                assert f.read() == expected, load_raw.__name__
+
+
+if __name__ == '__main__':
+    test_format_rows_matches_reference()
+    test_format_rows_matches_reference_on_repeated_rows()
+    print("✅ format_rows 与逐行实现生成的报告一致")
+    test_build_report_matches_file_based_path()
+    test_create_formatted_report_matches_file_based_path()
+    print("✅ 内存中的报告流程与经由 _processed.csv 的文件流程结果一致")
@@ -0,0 +1,241 @@
+# 公告全文索引：保存每个详情页 div.vF_detail_content 的正文，换关键词时可在本地检索而无需重新抓取
+# text_index.py
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+import lxml.html
+
+from config import TEXT_INDEX_PATH, HTML_CACHE_DIR, OUTPUT_FORMAT
+from province_mapping import PROVINCE_PINYIN_MAP, PINYIN_PROVINCE_MAP
+from url_builder import announcement_key
+
+_CONTENT_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' vF_detail_content ')]"
+_CJK_PATTERN = re.compile(r"([㐀-鿿豈-﫿])")
+_BLANK_LINES = re.compile(r"\s*\n\s*")
+
+
+def extract_text(html):
+    """Returns the cleaned text of the page's div.vF_detail_content (one line per block), or None if there is none."""
+    try:
+        root = lxml.html.fromstring(html)
+    except (ValueError, lxml.etree.ParserError):
+        return None
+    nodes = root.xpath(_CONTENT_XPATH)
+    if not nodes:
+        return None
+    content = nodes[0]
+    for node in content.xpath(".//script|.//style"):
+        node.drop_tree()
+    for node in content.xpath(".//br|.//p|.//tr|.//div|.//li"):
+        node.tail = "\n" + (node.tail or "")
+    text = _BLANK_LINES.sub("\n", content.text_content().replace("\xa0", " ")).strip()
+    return text or None
+
+
+def _tokens(text):
+    # FTS5 自带的分词器不切分中文：把每个汉字作为一个词，检索时按词组（相邻的字）匹配，任意长度的关键词都能命中
+    return _CJK_PATTERN.sub(r" \1 ", text)
+
+
+def _match_expression(terms, any_term=False):
+    phrases = ['"' + _tokens(term).replace('"', '""').strip() + '"' for term in terms if term.strip()]
+    return (" OR " if any_term else " AND ").join(phrases)
+
+
+class TextIndex:
+    """
+    A local full-text index (SQLite FTS5) of the announcement text of every
+    fetched detail page, keyed by `url_builder.announcement_key`.
+
+    Each entry keeps the URL, the province (pinyin) and the SHA-256 of the
+    page; re-adding an unchanged page is a no-op. Chinese text is indexed
+    character by character and searched as phrases, so a query for any
+    keyword matches exactly where that string occurs in the text.
+    """
+    def __init__(self, path=TEXT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                id           INTEGER PRIMARY KEY,
+                key          TEXT NOT NULL UNIQUE,
+                url          TEXT NOT NULL,
+                province     TEXT,
+                content_hash TEXT,
+                indexed_at   REAL NOT NULL,
+                text         TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(body, content='', columnsize=0);
+        """)
+        self._conn.commit()
+
+    def add(self, url, province, html):
+        """Indexes the announcement text of `html`. Returns True if the page was (re)indexed."""
+        content_hash = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        key = announcement_key(url)
+        with self._lock:
+            row = self._conn.execute("SELECT id, content_hash, text FROM pages WHERE key = ?", (key,)).fetchone()
+        if row and row[1] == content_hash:
+            return False
+        text = extract_text(html)
+        if text is None:
+            return False
+        with self._lock, self._conn:
+            # 提取正文时未持锁，写入前重新读取一次，以防其他线程已经索引了同一公告
+            row = self._conn.execute("SELECT id, content_hash, text FROM pages WHERE key = ?", (key,)).fetchone()
+            if row and row[1] == content_hash:
+                return False
+            if row:
+                # 无内容表 (content='') 删除时需要提供原来索引的文本
+                self._conn.execute("INSERT INTO pages_fts (pages_fts, rowid, body) VALUES ('delete', ?, ?)",
+                                   (row[0], _tokens(row[2])))
+                self._conn.execute("UPDATE pages SET url = ?, province = ?, content_hash = ?, indexed_at = ?, text = ? "
+                                   "WHERE id = ?", (url, province, content_hash, time.time(), text, row[0]))
+                page_id = row[0]
+            else:
+                page_id = self._conn.execute(
+                    "INSERT INTO pages (key, url, province, content_hash, indexed_at, text) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, url, province, content_hash, time.time(), text),
+                ).lastrowid
+            self._conn.execute("INSERT INTO pages_fts (rowid, body) VALUES (?, ?)", (page_id, _tokens(text)))
+        return True
+
+    def search(self, terms, province=None, any_term=False, limit=None):
+        """
+        Returns the pages whose text contains all of `terms` (any of them if
+        `any_term`), best matches first, as dicts with url, province and a
+        short snippet around the first match.
+        """
+        expression = _match_expression(terms, any_term)
+        if not expression:
+            return []
+        sql = ("SELECT p.url, p.province, p.text FROM pages_fts JOIN pages p ON p.id = pages_fts.rowid "
+               "WHERE pages_fts MATCH ?")
+        params = [expression]
+        if province:
+            sql += " AND p.province = ?"
+            params.append(province)
+        sql += " ORDER BY bm25(pages_fts)"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{"url": url, "province": prov, "snippet": _snippet(text, terms)} for url, prov, text in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _snippet(text, terms, width=30):
+    positions = [text.find(term) for term in terms if term in text]
+    start = max(0, min(positions) - width) if positions else 0
+    return text[start:start + 2 * width + max(map(len, terms))].replace("\n", " ")
+
+
+def parse_cached_pages(pages, sink, logger=print):
+    """
+    Runs the current province parsers over the archived (or else cached)
+    HTML of `pages` (search results) and writes their records to `sink`,
+    without touching the network. Returns (parsed, missing): pages parsed and
+    pages whose HTML is neither archived nor cached.
+    """
+    from html_cache import HtmlCache
+    from page_archive import PageArchive
+    from parse_pool import parse_html
+    from seen_index import parser_fingerprint, PARSER_FINGERPRINT_FIELD
+
+    archive = PageArchive()
+    cache = HtmlCache(HTML_CACHE_DIR, mode="read", ttl=None)
+    parsed = missing = 0
+    try:
+        for page in pages:
+            html = archive.get(page["url"]) or cache.get(page["url"])
+            if html is None:
+                missing += 1
+                continue
+            try:
+                records = parse_html(page["province"], page["url"], html)
+            except Exception as e:
+                logger(f"    ❌ 解析 {page['url']} 时发生错误: {e}")
+                continue
+            for record in records:
+                record["链接"] = page["url"]
+                record["省份"] = PINYIN_PROVINCE_MAP.get(page["province"], page["province"])
+                record[PARSER_FINGERPRINT_FIELD] = parser_fingerprint(page["province"])
+            sink.write(records)
+            parsed += 1
+    finally:
+        archive.close()
+        cache.close()
+    return parsed, missing
+
+
+def main(argv=None):
+    """本地检索: python main.py search-local 多联机 [--province 广东] [--parse]"""
+    parser = argparse.ArgumentParser(prog="main.py search-local", description="在已抓取公告的正文中检索关键词，无需联网")
+    parser.add_argument("terms", nargs="+", help="关键词（多个关键词默认需同时出现）")
+    parser.add_argument("--any", dest="any_term", action="store_true", help="出现任意一个关键词即可")
+    parser.add_argument("--province", help="只检索该省份（中文）")
+    parser.add_argument("--limit", type=int, default=0, help="最多返回的公告数，0 表示不限")
+    parser.add_argument("--db", default=TEXT_INDEX_PATH, help=f"全文索引路径 (默认 {TEXT_INDEX_PATH})")
+    parser.add_argument("--parse", action="store_true", help="用当前解析器解析命中公告的存档页面，输出结果文件")
+    parser.add_argument("--output", default="output", help="--parse 的输出目录")
+    parser.add_argument("--format", dest="output_format", choices=("csv", "jsonl"), default=OUTPUT_FORMAT, help="--parse 的结果文件格式")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"❌ 全文索引不存在: {args.db}（抓取时会自动建立）")
+        return 1
+    province = None
+    if args.province:
+        province = PROVINCE_PINYIN_MAP.get(args.province)
+        if province is None:
+            parser.error(f"未知的省份: {args.province}")
+
+    index = TextIndex(args.db)
+    try:
+        started = time.perf_counter()
+        pages = index.search(args.terms, province, args.any_term, args.limit or None)
+        elapsed = (time.perf_counter() - started) * 1000
+    finally:
+        index.close()
+
+    if not args.parse:
+        for page in pages:
+            print(f"{page['url']}  {page['snippet']}")
+    print(f"🔍 共 {len(pages)} 个公告命中（{elapsed:.1f} 毫秒）")
+    if not args.parse or not pages:
+        return 0
+
+    from sinks import open_sink
+    os.makedirs(args.output, exist_ok=True)
+    query = "_".join(args.terms)
+    base_path = os.path.join(args.output, f"本地检索_{query}_{time.strftime('%Y%m%d_%H%M%S')}")
+    sink = open_sink(base_path, args.output_format)
+    parsed, missing = parse_cached_pages(pages, sink)
+    path = sink.close()
+    if missing:
+        print(f"⚠️ {missing} 个公告的页面既不在页面存档也不在本地缓存中，未能解析。")
+    print(f"🎉 解析 {parsed} 个公告，获得 {sink.count} 条记录" + (f"，已保存到 {path}" if path else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 # url_builder.py
 
-from urllib.parse import quote
+import re
+from urllib.parse import quote, urlsplit, urlunsplit, parse_qsl, urlencode
 
 # 支持的省份与行政编码映射
 PROVINCE_ZONE_MAP = {
@@ -29,3 +30,37 @@ def build_ccgp_search_url(province: str, start_date: str, end_date: str, keyword
         f"&timeType=6&displayZone={quote(province)}&zoneId={zone_id}"
         f"&pppStatus=0&agentName="
     )
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    规范化公告链接，作为缓存和去重的键：统一使用 https、小写域名、去掉锚点，
+    并按参数名排序查询串，使同一页面的不同写法得到相同的结果。
+    """
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(("https", parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+# 同一公告可能通过镜像站点发布：同组域名下相同文档编号 (tYYYYMMDD_ID) 的链接视为同一公告
+MIRROR_HOST_GROUPS = [
+    {"www.ccgp.gov.cn", "ccgp.gov.cn", "www.ccgp-jiangsu.gov.cn", "ccgp-jiangsu.gov.cn"},
+]
+_DOC_ID_PATTERN = re.compile(r'/(t\d{8}_\d+)\.s?html?$')
+
+
+def announcement_key(url: str) -> str:
+    """
+    返回用于链接去重的键。在 canonicalize_url 的基础上：静态公告页 (.htm/.html)
+    忽略查询参数；属于同一镜像组的域名上的公告按文档编号归并，因此
+    http/https、追加的跟踪参数以及江苏省站与中央站的镜像链接会得到同一个键。
+    """
+    parts = urlsplit(canonicalize_url(url))
+    host = parts.netloc
+    match = _DOC_ID_PATTERN.search(parts.path)
+    if match:
+        for index, group in enumerate(MIRROR_HOST_GROUPS):
+            if host in group:
+                return f"mirror{index}:{match.group(1)}"
+        return urlunsplit((parts.scheme, host, parts.path, "", ""))
+    return urlunsplit(parts)
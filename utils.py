@@ -1,7 +1,11 @@
 # 工具方法（如日期处理、日志）
 # utils.py
 
-from datetime import datetime
+import re
+from datetime import date, datetime
+
+_DATE_PATTERN = re.compile(r'(\d{4})\s*[-年/.]\s*(\d{1,2})\s*[-月/.]\s*(\d{1,2})')
+_NUMBER_PATTERN = re.compile(r'-?\d+(?:\.\d+)?')
 
 def in_date_range(date_str, start, end):
     """检查日期是否在指定范围内"""
@@ -10,3 +14,26 @@ def in_date_range(date_str, start, end):
         return start <= d <= end
     except:
         return False
+
+
+def parse_date(value):
+    """解析 2025-06-11、2025/6/11、2025年06月11日（后面可带时间）等格式的日期，无法识别时返回 None"""
+    match = _DATE_PATTERN.search(str(value or ""))
+    if not match:
+        return None
+    try:
+        return date(*(int(part) for part in match.groups()))
+    except ValueError:
+        return None
+
+
+def parse_number(value):
+    """提取金额等数值，如 '¥1,234.50元' -> 1234.5，'12.5万元' -> 125000.0；无法识别时返回 None"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value or "").replace(",", "").replace("，", "")
+    match = _NUMBER_PATTERN.search(text)
+    if not match:
+        return None
+    number = float(match.group())
+    return number * 10000 if "万" in text[match.end():match.end() + 2] else number